@@ -1,5 +1,11 @@
 import os
 import re
+import threading
+import time
+from functools import lru_cache
+from typing import FrozenSet, Optional, Tuple
+
+from starlette.middleware.cors import CORSMiddleware
 
 PRODUCTION_ORIGINS = [
     "https://tray-ecru.vercel.app",
@@ -22,20 +28,21 @@ DEVELOPMENT_ORIGINS = [
     "ionic://localhost",
 ]
 
-LOCAL_NETWORK_ORIGIN = re.compile(
-    r"^https?://("
+# Allowed outside production, or in production with CORS_ALLOW_LOCALHOST=true.
+LOCAL_ORIGIN_PATTERNS = [
+    r"https?://("
     r"localhost|127\.0\.0\.1|"
     r"192\.168\.\d{1,3}\.\d{1,3}|"
     r"10\.\d{1,3}\.\d{1,3}\.\d{1,3}|"
     r"172\.(1[6-9]|2\d|3[01])\.\d{1,3}\.\d{1,3}"
-    r")(:\d+)?$"
-)
+    r")(:\d+)?",
+    r"exp://.*",
+    r"(?i:https?://[a-z0-9-]+\.(ngrok-free\.dev|ngrok\.io|ngrok\.app)(:\d+)?)",
+]
 
-EXPO_ORIGIN = re.compile(r"^exp://")
-NGROK_ORIGIN = re.compile(
-    r"^https?://[a-z0-9-]+\.(ngrok-free\.dev|ngrok\.io|ngrok\.app)(:\d+)?$",
-    re.IGNORECASE,
-)
+DECISION_CACHE_SIZE = 4096
+CONFIG_CHECK_SECONDS = 5.0
+_CONFIG_VARIABLES = ("NODE_ENV", "CORS_ALLOWED_ORIGINS", "ALLOWED_ORIGINS", "CORS_ALLOW_LOCALHOST")
 
 
 def _parse_extra_origins() -> list[str]:
@@ -56,18 +63,83 @@ def get_allowed_origins() -> list[str]:
     return list(dict.fromkeys([*base, *extras]))
 
 
+def _config_fingerprint() -> Tuple[Optional[str], ...]:
+    return tuple(os.getenv(name) for name in _CONFIG_VARIABLES)
+
+
+class CORSPolicy:
+    """Allowed origins compiled into a set of exact origins plus one combined pattern.
+
+    Decisions are memoised per origin, so repeated preflights from the same client are a
+    single cache lookup.
+    """
+
+    def __init__(self, exact: FrozenSet[str], pattern: Optional[str]) -> None:
+        self.exact = exact
+        self.pattern = re.compile(pattern) if pattern else None
+        self.allows = lru_cache(maxsize=DECISION_CACHE_SIZE)(self._decide)
+
+    @classmethod
+    def from_env(cls) -> "CORSPolicy":
+        local_allowed = (
+            os.getenv("NODE_ENV", "development") != "production"
+            or os.getenv("CORS_ALLOW_LOCALHOST") == "true"
+        )
+        pattern = None
+        if local_allowed:
+            pattern = "|".join(f"(?:{item})" for item in LOCAL_ORIGIN_PATTERNS)
+        return cls(frozenset(get_allowed_origins()), pattern)
+
+    def _decide(self, origin: str) -> bool:
+        if origin in self.exact:
+            return True
+        return bool(self.pattern and self.pattern.fullmatch(origin))
+
+
+class _PolicyHolder:
+    """Current policy, rebuilt (and swapped in whole) when the CORS env vars change."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._fingerprint = _config_fingerprint()
+        self._policy = CORSPolicy.from_env()
+        self._checked_at = time.monotonic()
+
+    def get(self) -> CORSPolicy:
+        if time.monotonic() - self._checked_at >= CONFIG_CHECK_SECONDS:
+            self.reload()
+        return self._policy
+
+    def reload(self, force: bool = False) -> CORSPolicy:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            fingerprint = _config_fingerprint()
+            if force or fingerprint != self._fingerprint:
+                self._policy = CORSPolicy.from_env()
+                self._fingerprint = fingerprint
+            return self._policy
+
+
+_holder = _PolicyHolder()
+
+
+def get_cors_policy() -> CORSPolicy:
+    return _holder.get()
+
+
+def reload_cors_policy() -> CORSPolicy:
+    """Recompile the policy from the environment now, e.g. after changing os.environ."""
+    return _holder.reload(force=True)
+
+
 def is_origin_allowed(origin: str | None) -> bool:
     if not origin:
         return True
+    return get_cors_policy().allows(origin)
 
-    if origin in get_allowed_origins():
-        return True
-
-    if LOCAL_NETWORK_ORIGIN.match(origin) or EXPO_ORIGIN.match(origin):
-        return True
 
-    node_env = os.getenv("NODE_ENV", "development")
-    if node_env != "production" or os.getenv("CORS_ALLOW_LOCALHOST") == "true":
-        return bool(NGROK_ORIGIN.match(origin))
+class PolicyCORSMiddleware(CORSMiddleware):
+    """Starlette's CORS handling with origin decisions delegated to the shared policy."""
 
-    return False
+    def is_allowed_origin(self, origin: str) -> bool:
+        return is_origin_allowed(origin)
@@ -1,40 +1,33 @@
-import os
-
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 load_dotenv()
 
-from cors_origins import get_allowed_origins
-from routers import admin_ai, ai, autocomplete, chatbot, jobpost, resume
+from cors_origins import PolicyCORSMiddleware
+from routers import admin_ai, ai, autocomplete, chatbot, jobpost, matching, resume
+from services.tracing import TracingMiddleware
 
 app = FastAPI(
     title="Tray AI FastAPI Backend",
     description="AI-powered API for Resume, Job Posts, Chatbot, and Autocomplete",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=get_allowed_origins(),
-    allow_origin_regex=(
-        r"^https?://("
-        r"localhost|127\.0\.0\.1|"
-        r"192\.168\.\d{1,3}\.\d{1,3}|"
-        r"10\.\d{1,3}\.\d{1,3}\.\d{1,3}|"
-        r"172\.(1[6-9]|2\d|3[01])\.\d{1,3}\.\d{1,3}"
-        r")(:\d+)?$"
-        r"|^exp://.*"
-        r"|^https?://[a-z0-9-]+\.(ngrok-free\.dev|ngrok\.io|ngrok\.app)(:\d+)?$"
-    )
-    if os.getenv("NODE_ENV", "development") != "production"
-    or os.getenv("CORS_ALLOW_LOCALHOST") == "true"
-    else None,
+    PolicyCORSMiddleware,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "Server-Timing",
+        "X-AI-Profile",
+        "X-Reused-Result-Of",
+        "X-Semantic-Cache",
+    ],
 )
+app.add_middleware(TracingMiddleware)
 
 app.include_router(ai.router, prefix="/api/ai", tags=["AI"])
 app.include_router(admin_ai.router, prefix="/api/admin-ai", tags=["Admin AI"])
@@ -42,6 +35,7 @@ app.include_router(resume.router, prefix="/api/resume", tags=["Resume"])
 app.include_router(jobpost.router, prefix="/api/jobpost", tags=["Job Post"])
 app.include_router(chatbot.router, prefix="/api/chat", tags=["Chatbot"])
 app.include_router(autocomplete.router, prefix="/api/autocomplete", tags=["Autocomplete"])
+app.include_router(matching.router, prefix="/api/match", tags=["Matching"])
 
 
 @app.get("/health")
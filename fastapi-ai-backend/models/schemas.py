@@ -14,6 +14,7 @@ class ResumeGenerateRequest(AIRequestOptions):
     skills: List[str]
     industry: Optional[str] = "technology"
     tone: Optional[str] = "professional"
+    variants: int = Field(default=1, ge=1, le=5)
 
 
 class ResumeValidateRequest(AIRequestOptions):
@@ -25,6 +26,7 @@ class ResumeValidateRequest(AIRequestOptions):
 class ResumeScoreRequest(AIRequestOptions):
     resume_text: str
     target_job: Optional[str] = None
+    sectioned: bool = False
 
 
 class ProfileInsightsRequest(AIRequestOptions):
@@ -52,6 +54,7 @@ class JobPostRequest(AIRequestOptions):
     responsibilities: List[str] = Field(default_factory=list)
     salary_range: Optional[str] = None
     tone: Optional[str] = "professional"
+    variants: int = Field(default=1, ge=1, le=5)
 
 
 class JobPostImproveRequest(AIRequestOptions):
@@ -63,6 +66,19 @@ class JobPostExtractSkillsRequest(AIRequestOptions):
     job_description: str
 
 
+class JobDescriptionScanRequest(BaseModel):
+    descriptions: List[str]
+
+
+class JobPostDedupItem(BaseModel):
+    id: Optional[str] = None
+    text: str
+
+
+class JobPostDedupRequest(BaseModel):
+    posts: List[JobPostDedupItem] = Field(max_length=500)
+
+
 class ChatMessage(BaseModel):
     role: Literal["user", "assistant"]
     content: str
@@ -112,3 +128,42 @@ class PlatformAnalyticsSnapshot(BaseModel):
 
 class AdminInsightsRequest(AIRequestOptions):
     snapshot: PlatformAnalyticsSnapshot
+
+
+class MatchCandidate(BaseModel):
+    id: str
+    name: Optional[str] = ""
+    location: Optional[str] = ""
+    skills: List[str] = Field(default_factory=list)
+    certifications: List[str] = Field(default_factory=list)
+    experience: List[str] = Field(default_factory=list)
+    education: List[str] = Field(default_factory=list)
+    target_role: Optional[str] = None
+    resume_text: Optional[str] = None
+
+
+class MatchJob(BaseModel):
+    id: str
+    role_title: str
+    company_name: Optional[str] = ""
+    location: Optional[str] = ""
+    job_type: Optional[str] = ""
+    experience_level: Optional[str] = ""
+    required_skills: List[str] = Field(default_factory=list)
+    nice_to_have: List[str] = Field(default_factory=list)
+    responsibilities: List[str] = Field(default_factory=list)
+    job_post: Optional[str] = None
+
+
+class MatchCandidatesIndexRequest(BaseModel):
+    candidates: List[MatchCandidate]
+
+
+class MatchJobsIndexRequest(BaseModel):
+    jobs: List[MatchJob]
+
+
+class MatchQueryRequest(AIRequestOptions):
+    k: int = Field(default=10, ge=1, le=100)
+    rerank: bool = False
+    rerank_top: int = Field(default=10, ge=1, le=25)
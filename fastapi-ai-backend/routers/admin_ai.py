@@ -1,23 +1,24 @@
 import json
-import os
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Header, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Request
 
-from models.schemas import AdminInsightsRequest
+from models.schemas import AdminInsightsRequest, PlatformAnalyticsSnapshot
+from services.admin_auth import check_admin_secret
 from services.ai_service import AIServiceError, ask_ai
+from services.analytics_aggregation import MAX_BODY_BYTES, EventBodyTooLarge, aggregate_stream
+from services.bias_lexicon import scan_descriptions
+from services.fast_json import FastJSONRoute, model_json_response, validate_model_json
+from services.near_duplicates import collapse_near_duplicates
+from services.token_budget import ROUTE_BUDGETS, fit_json_collections
+from services.tracing import mark, span
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
+MAX_FLAGGED_EXCERPTS = 40
 
-@router.post("/insights")
-async def generate_admin_insights(
-    req: AdminInsightsRequest, x_admin_ai_secret: str | None = Header(default=None)
-):
-    required_secret = os.getenv("ADMIN_AI_SHARED_SECRET")
-    if required_secret and x_admin_ai_secret != required_secret:
-        raise HTTPException(status_code=403, detail="Forbidden")
 
-    system_prompt = """You are an expert workforce marketplace analyst for an admin console.
+INSIGHTS_SYSTEM_PROMPT = """You are an expert workforce marketplace analyst for an admin console.
 Return ONLY valid JSON matching this exact structure:
 {
   "platform_analytics_intelligence": {
@@ -39,23 +40,102 @@ Return ONLY valid JSON matching this exact structure:
 }
 No markdown, no prose outside JSON."""
 
-    user_prompt = (
-        "Create admin AI insights using this platform snapshot JSON:\n\n"
-        f"{req.snapshot.model_dump_json(indent=2)}"
-    )
+
+async def _aggregate_request_events(request: Request) -> PlatformAnalyticsSnapshot:
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail=f"Event body exceeds {MAX_BODY_BYTES} bytes")
+    try:
+        with span("aggregate"):
+            return await aggregate_stream(
+                request.stream(),
+                content_type=request.headers.get("content-type", ""),
+            )
+    except EventBodyTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except (ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid event data: {exc}")
+
+
+async def _generate_insights(
+    snapshot: PlatformAnalyticsSnapshot, provider: Optional[str], model: Optional[str]
+):
+    with span("prompt"):
+        # Reposts are collapsed and the rest pre-screened locally; only flagged excerpts
+        # reach the model.
+        descriptions, duplicate_groups = collapse_near_duplicates(snapshot.recent_job_descriptions)
+        flags = scan_descriptions(descriptions)
+        prompt_snapshot = snapshot.model_dump(exclude={"recent_job_descriptions"})
+        if duplicate_groups:
+            reposts = sum(len(group) - 1 for group in duplicate_groups)
+            prompt_snapshot["suspicious_signals"] = [
+                *snapshot.suspicious_signals,
+                f"Recent job descriptions include {reposts} near-duplicate reposts "
+                f"({len(duplicate_groups)} clusters)",
+            ]
+        prompt_snapshot["job_descriptions_scanned"] = len(descriptions)
+        prompt_snapshot["flagged_job_description_excerpts"] = [
+            {"excerpt": flag.excerpt, "phrase": flag.phrase, "reason": flag.reason}
+            for flag in flags[:MAX_FLAGGED_EXCERPTS]
+        ]
+        prompt_snapshot = fit_json_collections(
+            prompt_snapshot, ROUTE_BUDGETS["admin-ai/insights"]
+        )
+        user_prompt = (
+            "Create admin AI insights using this platform snapshot JSON. "
+            "Job descriptions were pre-screened; base discriminatory_job_description_flags "
+            "on flagged_job_description_excerpts.\n\n"
+            f"{json.dumps(prompt_snapshot, indent=2)}"
+        )
 
     try:
         raw_result = await ask_ai(
-            system_prompt=system_prompt,
+            system_prompt=INSIGHTS_SYSTEM_PROMPT,
             user_prompt=user_prompt,
-            provider=req.provider,
-            model=req.model,
+            provider=provider,
+            model=model,
             max_tokens=1200,
             json_mode=True,
             temperature=0.2,
         )
-        return json.loads(raw_result)
+        with span("parse"):
+            body = validate_model_json(raw_result)
+        return model_json_response(body)
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
     except Exception:
         raise HTTPException(status_code=500, detail="AI returned invalid response")
+
+
+@router.post("/insights")
+async def generate_admin_insights(
+    req: AdminInsightsRequest, x_admin_ai_secret: str | None = Header(default=None)
+):
+    mark("validate")
+    check_admin_secret(x_admin_ai_secret)
+    return await _generate_insights(req.snapshot, req.provider, req.model)
+
+
+@router.post("/snapshot")
+async def aggregate_snapshot(
+    request: Request, x_admin_ai_secret: str | None = Header(default=None)
+):
+    """Aggregate raw NDJSON or CSV (`Content-Type: text/csv`) events into a snapshot."""
+    mark("validate")
+    check_admin_secret(x_admin_ai_secret)
+    snapshot = await _aggregate_request_events(request)
+    return model_json_response(snapshot.model_dump_json().encode())
+
+
+@router.post("/insights/from-events")
+async def generate_admin_insights_from_events(
+    request: Request,
+    provider: Optional[Literal["openai", "claude"]] = None,
+    model: Optional[str] = None,
+    x_admin_ai_secret: str | None = Header(default=None),
+):
+    """Aggregate raw events server-side and generate insights from the resulting snapshot."""
+    mark("validate")
+    check_admin_secret(x_admin_ai_secret)
+    snapshot = await _aggregate_request_events(request)
+    return await _generate_insights(snapshot, provider, model)
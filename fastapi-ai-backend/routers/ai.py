@@ -2,21 +2,50 @@ from fastapi import APIRouter, HTTPException
 
 from models.schemas import GenerateTextRequest
 from services.ai_service import AIServiceError, ask_ai
+from services.fast_json import FastJSONRoute, json_response
+from services.semantic_cache import scope_key, semantic_cache
+from services.token_budget import budget_field
+from services.tracing import mark, span
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("/generate")
 async def generate_text(req: GenerateTextRequest):
+    mark("validate")
+    # json_mode answers depend on the exact input, so they never go through the semantic cache.
+    use_cache = not req.json_mode
+    cache_scope = scope_key(req.system_prompt, req.provider, req.model, req.max_tokens)
+    if use_cache:
+        with span("cache"):
+            cached = semantic_cache.lookup("ai/generate", req.user_prompt, cache_scope)
+        if cached is not None:
+            return json_response({"output": cached}, headers={"X-Semantic-Cache": "hit"})
+
+    with span("prompt"):
+        # Compression would break structured input, so json_mode prompts are sent as given.
+        user_prompt = req.user_prompt
+        if not req.json_mode:
+            user_prompt = budget_field("ai/generate", user_prompt, query=req.system_prompt)
+
     try:
         text = await ask_ai(
             system_prompt=req.system_prompt,
-            user_prompt=req.user_prompt,
+            user_prompt=user_prompt,
             provider=req.provider,
             model=req.model,
             max_tokens=req.max_tokens,
             json_mode=req.json_mode,
         )
-        return {"output": text}
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
+
+    if use_cache:
+        semantic_cache.store("ai/generate", req.user_prompt, cache_scope, text)
+    return json_response({"output": text})
+
+
+@router.get("/semantic-cache/stats")
+async def semantic_cache_stats():
+    """Per-route lookups, hit rate and hit similarity distribution of the semantic cache."""
+    return json_response(semantic_cache.stats())
@@ -4,8 +4,10 @@ from fastapi import APIRouter, HTTPException
 
 from models.schemas import AutocompleteRequest
 from services.ai_service import AIServiceError, ask_ai
+from services.fast_json import FastJSONRoute, json_response
+from services.tracing import mark, span
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 FIELD_PROMPTS = {
     "job_title": (
@@ -29,21 +31,23 @@ FIELD_PROMPTS = {
 
 @router.post("/suggest")
 async def suggest(req: AutocompleteRequest):
+    mark("validate")
     if len(req.partial_text.strip()) < 2:
-        return {"suggestions": []}
+        return json_response({"suggestions": []})
 
-    prompt_template = FIELD_PROMPTS.get(
-        req.field_type,
-        "Suggest {n} completions for '{text}'. Return ONLY JSON array.",
-    )
+    with span("prompt"):
+        prompt_template = FIELD_PROMPTS.get(
+            req.field_type,
+            "Suggest {n} completions for '{text}'. Return ONLY JSON array.",
+        )
 
-    prompt = prompt_template.format(
-        n=req.max_suggestions,
-        text=req.partial_text,
-        ctx=json.dumps(req.context) if req.context else "general",
-    )
+        prompt = prompt_template.format(
+            n=req.max_suggestions,
+            text=req.partial_text,
+            ctx=json.dumps(req.context) if req.context else "general",
+        )
 
-    system = "You are an autocomplete engine. Return ONLY valid JSON array of strings. No markdown."
+        system = "You are an autocomplete engine. Return ONLY valid JSON array of strings. No markdown."
 
     try:
         result = await ask_ai(
@@ -54,12 +58,13 @@ async def suggest(req: AutocompleteRequest):
             max_tokens=200,
             temperature=0.3,
         )
-        clean = result.strip().replace("```json", "").replace("```", "").strip()
-        suggestions = json.loads(clean)
+        with span("parse"):
+            clean = result.strip().replace("```json", "").replace("```", "").strip()
+            suggestions = json.loads(clean)
         if not isinstance(suggestions, list):
-            return {"suggestions": []}
-        return {"suggestions": suggestions[: req.max_suggestions]}
+            return json_response({"suggestions": []})
+        return json_response({"suggestions": suggestions[: req.max_suggestions]})
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
     except Exception:
-        return {"suggestions": []}
+        return json_response({"suggestions": []})
@@ -2,8 +2,11 @@ from fastapi import APIRouter, HTTPException
 
 from models.schemas import ChatRequest
 from services.ai_service import AIServiceError, ask_ai
+from services.fast_json import FastJSONRoute, json_response
+from services.semantic_cache import scope_key, semantic_cache
+from services.tracing import mark, span
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 SYSTEM_PROMPT = """You are a friendly, helpful support assistant for a job search mobile app.
 
@@ -25,23 +28,36 @@ Rules:
 
 @router.post("/message")
 async def chat(req: ChatRequest):
-    context_note = ""
-    if req.user_context:
-        context_note = (
-            "\n[User context: "
-            f"name={req.user_context.get('name', 'unknown')}, "
-            f"plan={req.user_context.get('plan', 'free')}]"
+    mark("validate")
+    with span("prompt"):
+        context_note = ""
+        if req.user_context:
+            context_note = (
+                "\n[User context: "
+                f"name={req.user_context.get('name', 'unknown')}, "
+                f"plan={req.user_context.get('plan', 'free')}]"
+            )
+
+        history_text = "\n".join(
+            [f"{msg.role}: {msg.content}" for msg in req.history[-10:]]
         )
 
-    history_text = "\n".join(
-        [f"{msg.role}: {msg.content}" for msg in req.history[-10:]]
-    )
+        user_prompt = (
+            f"Conversation history:\n{history_text}\n\n"
+            f"User message: {req.message}\n"
+            "Reply as the assistant only."
+        )
 
-    user_prompt = (
-        f"Conversation history:\n{history_text}\n\n"
-        f"User message: {req.message}\n"
-        "Reply as the assistant only."
+    # The user's name is left out of the scope so other users asking the same thing can hit;
+    # replies that mention the name are not stored.
+    user_name = req.user_context.get("name", "")
+    cache_scope = scope_key(
+        req.provider, req.model, req.user_context.get("plan", "free"), history_text
     )
+    with span("cache"):
+        cached = semantic_cache.lookup("chat/message", req.message, cache_scope)
+    if cached is not None:
+        return json_response({"reply": cached}, headers={"X-Semantic-Cache": "hit"})
 
     try:
         reply = await ask_ai(
@@ -52,6 +68,10 @@ async def chat(req: ChatRequest):
             max_tokens=300,
             temperature=0.7,
         )
-        return {"reply": reply.strip()}
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
+
+    reply = reply.strip()
+    if not user_name or user_name.lower() not in reply.lower():
+        semantic_cache.store("chat/message", req.message, cache_scope, reply)
+    return json_response({"reply": reply})
@@ -1,15 +1,32 @@
-import json
+from fastapi import APIRouter, Depends, HTTPException
 
-from fastapi import APIRouter, HTTPException
+from models.schemas import (
+    JobDescriptionScanRequest,
+    JobPostDedupRequest,
+    JobPostExtractSkillsRequest,
+    JobPostImproveRequest,
+    JobPostRequest,
+)
+from services import variant_cache
+from services.admin_auth import require_admin_secret
+from services.ai_service import AIServiceError, ask_ai, ask_ai_variants
+from services.bias_lexicon import scan_descriptions
+from services.fast_json import (
+    FastJSONRoute,
+    json_response,
+    model_json_response,
+    validate_model_json,
+)
+from services.near_duplicates import content_id, job_posts
+from services.token_budget import budget_field
+from services.tracing import mark, span
 
-from models.schemas import JobPostExtractSkillsRequest, JobPostImproveRequest, JobPostRequest
-from services.ai_service import AIServiceError, ask_ai
-
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("/generate")
 async def generate_job_post(req: JobPostRequest):
+    mark("validate")
     system = (
         "You are an expert HR copywriter and talent acquisition specialist. "
         "Write compelling, inclusive job posts that attract top candidates. "
@@ -18,7 +35,8 @@ async def generate_job_post(req: JobPostRequest):
         "5) Short company culture note. Use gender-neutral language always."
     )
 
-    user = f"""Create a complete job posting:
+    with span("prompt"):
+        user = f"""Create a complete job posting:
 - Role: {req.role_title} ({req.experience_level} level)
 - Company: {req.company_name}
 {f'- About Company: {req.company_description}' if req.company_description else ''}
@@ -29,21 +47,39 @@ async def generate_job_post(req: JobPostRequest):
 {f'- Salary: {req.salary_range}' if req.salary_range else ''}
 - Writing Tone: {req.tone}"""
 
-    try:
-        post = await ask_ai(
+    async def generate(count: int) -> list[str]:
+        return await ask_ai_variants(
             system_prompt=system,
             user_prompt=user,
             provider=req.provider,
             model=req.model,
             max_tokens=900,
+            n=count,
         )
-        return {"job_post": post.strip(), "word_count": len(post.split())}
+
+    key = variant_cache.cache_key("jobpost/generate", req)
+    try:
+        posts = await variant_cache.serve(key, req.variants, generate)
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
 
+    response = {"job_post": posts[0], "word_count": len(posts[0].split())}
+    if req.variants > 1:
+        response["variants"] = [
+            {"job_post": post, "word_count": len(post.split())} for post in posts
+        ]
+    return json_response(response)
+
 
 @router.post("/improve")
 async def improve_job_post(req: JobPostImproveRequest):
+    mark("validate")
+    result_key = ("improve", req.improvement_type, req.provider, req.model)
+    with span("dedup"):
+        reusable = job_posts.stored_result(req.existing_post, result_key)
+    if reusable:
+        return json_response(reusable[1], headers={"X-Reused-Result-Of": reusable[0]})
+
     improvement_instructions = {
         "clarity": "Make it clearer and easier to understand. Remove jargon.",
         "tone": "Make the tone more engaging and human, less corporate.",
@@ -52,9 +88,11 @@ async def improve_job_post(req: JobPostImproveRequest):
         "seo": "Optimize for job board SEO without keyword stuffing.",
     }
 
-    instruction = improvement_instructions.get(req.improvement_type, "Improve the overall quality.")
-    system = f"You are an expert job post editor. {instruction} Return only the improved post."
-    user = f"Improve this job post:\n\n{req.existing_post}"
+    with span("prompt"):
+        instruction = improvement_instructions.get(req.improvement_type, "Improve the overall quality.")
+        system = f"You are an expert job post editor. {instruction} Return only the improved post."
+        existing_post = budget_field("jobpost/improve", req.existing_post)
+        user = f"Improve this job post:\n\n{existing_post}"
 
     try:
         improved = await ask_ai(
@@ -64,30 +102,80 @@ async def improve_job_post(req: JobPostImproveRequest):
             model=req.model,
             max_tokens=900,
         )
-        return {"improved_post": improved.strip()}
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
 
+    result = {"improved_post": improved.strip()}
+    job_posts.store_result(req.existing_post, result_key, result)
+    return json_response(result)
+
 
 @router.post("/extract-skills")
 async def extract_skills_from_post(req: JobPostExtractSkillsRequest):
+    mark("validate")
+    result_key = ("extract-skills", req.provider, req.model)
+    with span("dedup"):
+        reusable = job_posts.stored_result(req.job_description, result_key)
+    if reusable:
+        return model_json_response(reusable[1], headers={"X-Reused-Result-Of": reusable[0]})
+
     system = (
         "Extract skills from a job post. Return ONLY valid JSON: "
         "{\"required_skills\": [\"skill1\"], \"nice_to_have\": [\"skill1\"], "
         "\"experience_years\": \"X-Y years or null\", \"key_responsibilities\": [\"resp1\"]}"
     )
 
+    with span("prompt"):
+        job_description = budget_field("jobpost/extract-skills", req.job_description)
+
     try:
         result = await ask_ai(
             system_prompt=system,
-            user_prompt=req.job_description,
+            user_prompt=job_description,
             provider=req.provider,
             model=req.model,
             json_mode=True,
             max_tokens=400,
         )
-        return json.loads(result)
+        with span("parse"):
+            skills = validate_model_json(result)
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
     except Exception:
         raise HTTPException(status_code=500, detail="AI returned invalid JSON")
+
+    job_posts.store_result(req.job_description, result_key, skills)
+    return model_json_response(skills)
+
+
+@router.post("/scan-bias")
+async def scan_bias(req: JobDescriptionScanRequest):
+    """Flag biased or exclusionary phrasing with a local lexicon; no AI call."""
+    mark("validate")
+    with span("scan"):
+        flags = scan_descriptions(req.descriptions)
+    return json_response(
+        {"scanned": len(req.descriptions), "flags": [flag._asdict() for flag in flags]}
+    )
+
+
+@router.post("/near-duplicates", dependencies=[Depends(require_admin_secret)])
+async def find_near_duplicates(req: JobPostDedupRequest):
+    """Index posts and return each one's near-duplicates and duplicate cluster; no AI call."""
+    mark("validate")
+    results = []
+    with span("dedup"):
+        for post in req.posts:
+            post_id = post.id or content_id(post.text)
+            duplicates = job_posts.add(post_id, post.text)
+            results.append(
+                {
+                    "id": post_id,
+                    "duplicates": [
+                        {"id": item_id, "similarity": round(score, 3)}
+                        for item_id, score in duplicates
+                    ],
+                    "cluster": job_posts.cluster(post_id),
+                }
+            )
+    return json_response({"posts": results})
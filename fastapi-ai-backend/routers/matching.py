@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from models.schemas import MatchCandidatesIndexRequest, MatchJobsIndexRequest, MatchQueryRequest
+from services.admin_auth import require_admin_secret
+from services.ai_service import AIServiceError
+from services.fast_json import FastJSONRoute, json_response
+from services.matching import find_matches, get_index, index_candidates, index_jobs
+from services.tracing import mark, span
+
+router = APIRouter(route_class=FastJSONRoute)
+
+# Index writes wait on a cross-process file lock, so these routes are plain `def` and run in
+# the threadpool rather than on the event loop.
+
+
+@router.post("/candidates", dependencies=[Depends(require_admin_secret)])
+def upsert_candidates(req: MatchCandidatesIndexRequest):
+    mark("validate")
+    with span("index"):
+        indexed = index_candidates(req.candidates)
+    return json_response({"indexed": indexed, "total": len(get_index("candidates"))})
+
+
+@router.post("/jobs", dependencies=[Depends(require_admin_secret)])
+def upsert_jobs(req: MatchJobsIndexRequest):
+    mark("validate")
+    with span("index"):
+        indexed = index_jobs(req.jobs)
+    return json_response({"indexed": indexed, "total": len(get_index("jobs"))})
+
+
+@router.delete("/candidates/{candidate_id}", dependencies=[Depends(require_admin_secret)])
+def remove_candidate(candidate_id: str):
+    return json_response({"removed": get_index("candidates").remove(candidate_id)})
+
+
+@router.delete("/jobs/{job_id}", dependencies=[Depends(require_admin_secret)])
+def remove_job(job_id: str):
+    return json_response({"removed": get_index("jobs").remove(job_id)})
+
+
+async def _match(source_kind: str, source_id: str, target_kind: str, req: MatchQueryRequest):
+    mark("validate")
+    try:
+        matches = await find_matches(
+            source_kind,
+            source_id,
+            target_kind,
+            k=req.k,
+            rerank=req.rerank,
+            rerank_top=req.rerank_top,
+            provider=req.provider,
+            model=req.model,
+        )
+    except AIServiceError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message)
+    except Exception:
+        raise HTTPException(status_code=500, detail="AI returned invalid JSON")
+
+    if matches is None:
+        raise HTTPException(status_code=404, detail=f"Unknown {source_kind[:-1]} id")
+    return json_response({"matches": matches})
+
+
+@router.post("/jobs/{job_id}/candidates")
+async def match_candidates_for_job(job_id: str, req: MatchQueryRequest):
+    return await _match("jobs", job_id, "candidates", req)
+
+
+@router.post("/candidates/{candidate_id}/jobs")
+async def match_jobs_for_candidate(candidate_id: str, req: MatchQueryRequest):
+    return await _match("candidates", candidate_id, "jobs", req)
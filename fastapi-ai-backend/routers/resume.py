@@ -1,5 +1,3 @@
-import json
-
 from fastapi import APIRouter, HTTPException
 
 from models.schemas import (
@@ -8,13 +6,24 @@ from models.schemas import (
     ResumeScoreRequest,
     ResumeValidateRequest,
 )
-from services.ai_service import AIServiceError, ask_ai
+from services import variant_cache
+from services.ai_service import AIServiceError, ask_ai, ask_ai_variants
+from services.fast_json import (
+    FastJSONRoute,
+    json_response,
+    model_json_response,
+    validate_model_json,
+)
+from services.resume_scoring import score_resume_sections
+from services.token_budget import budget_field
+from services.tracing import mark, span
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("/generate-summary")
 async def generate_summary(req: ResumeGenerateRequest):
+    mark("validate")
     system = (
         "You are an expert resume writer with 15 years of experience. "
         "Write concise, impactful resume summaries that get interviews. "
@@ -22,28 +31,39 @@ async def generate_summary(req: ResumeGenerateRequest):
         "match the tone requested, no cliches like 'dynamic' or 'passionate'."
     )
 
-    user = f"""Write a resume summary for:
+    with span("prompt"):
+        user = f"""Write a resume summary for:
 - Job Title: {req.job_title}
 - Years of Experience: {req.years_experience}
 - Key Skills: {', '.join(req.skills)}
 - Industry: {req.industry}
 - Tone: {req.tone}"""
 
-    try:
-        summary = await ask_ai(
+    async def generate(count: int) -> list[str]:
+        return await ask_ai_variants(
             system_prompt=system,
             user_prompt=user,
             provider=req.provider,
             model=req.model,
             max_tokens=200,
+            n=count,
         )
-        return {"summary": summary.strip()}
+
+    key = variant_cache.cache_key("resume/generate-summary", req)
+    try:
+        summaries = await variant_cache.serve(key, req.variants, generate)
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
 
+    response = {"summary": summaries[0]}
+    if req.variants > 1:
+        response["variants"] = summaries
+    return json_response(response)
+
 
 @router.post("/validate-field")
 async def validate_field(req: ResumeValidateRequest):
+    mark("validate")
     system = (
         "You are a resume expert. Validate resume fields and return ONLY valid JSON. "
         "No markdown, no explanation outside the JSON. "
@@ -51,7 +71,8 @@ async def validate_field(req: ResumeValidateRequest):
         "\"suggestion\": \"improved version or empty string\"}"
     )
 
-    user = f"""Validate this resume field:
+    with span("prompt"):
+        user = f"""Validate this resume field:
 Field: {req.field_name}
 Value: \"{req.field_value}\"
 {f'Context (target role): {req.context}' if req.context else ''}"""
@@ -65,7 +86,9 @@ Value: \"{req.field_value}\"
             json_mode=True,
             max_tokens=300,
         )
-        return json.loads(result)
+        with span("parse"):
+            body = validate_model_json(result)
+        return model_json_response(body)
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
     except Exception:
@@ -74,6 +97,21 @@ Value: \"{req.field_value}\"
 
 @router.post("/score")
 async def score_resume(req: ResumeScoreRequest):
+    mark("validate")
+    if req.sectioned:
+        try:
+            scored = await score_resume_sections(
+                req.resume_text,
+                target_job=req.target_job,
+                provider=req.provider,
+                model=req.model,
+            )
+            return json_response(scored)
+        except AIServiceError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=exc.message)
+        except Exception:
+            raise HTTPException(status_code=500, detail="AI returned invalid JSON")
+
     system = (
         "You are an ATS (Applicant Tracking System) expert and hiring manager. "
         "Score resumes and return ONLY valid JSON: "
@@ -81,8 +119,10 @@ async def score_resume(req: ResumeScoreRequest):
         "\"strengths\": [\"str1\", \"str2\"], \"improvements\": [\"imp1\", \"imp2\"], \"ats_friendly\": bool}"
     )
 
-    user = f"""Score this resume{f' for the role: {req.target_job}' if req.target_job else ''}:
-{req.resume_text}"""
+    with span("prompt"):
+        resume_text = budget_field("resume/score", req.resume_text, query=req.target_job or "")
+        user = f"""Score this resume{f' for the role: {req.target_job}' if req.target_job else ''}:
+{resume_text}"""
 
     try:
         result = await ask_ai(
@@ -93,7 +133,9 @@ async def score_resume(req: ResumeScoreRequest):
             json_mode=True,
             max_tokens=500,
         )
-        return json.loads(result)
+        with span("parse"):
+            body = validate_model_json(result)
+        return model_json_response(body)
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
     except Exception:
@@ -102,6 +144,7 @@ async def score_resume(req: ResumeScoreRequest):
 
 @router.post("/profile-insights")
 async def profile_insights(req: ProfileInsightsRequest):
+    mark("validate")
     system = (
         "You are an expert career coach and profile optimization assistant. "
         "Analyze candidate profile data for job readiness and return ONLY valid JSON. "
@@ -115,7 +158,14 @@ async def profile_insights(req: ProfileInsightsRequest):
         "\"next_actions\": [\"action\"]}."
     )
 
-    user = f"""Analyze this candidate profile and return recommendations:
+    with span("prompt"):
+        resume_text = budget_field(
+            "resume/profile-insights",
+            req.resume_text,
+            query=" ".join([req.target_role or "", *req.skills]),
+            share=0.8,
+        )
+        user = f"""Analyze this candidate profile and return recommendations:
 - Name: {req.name or 'N/A'}
 - Email present: {'yes' if req.email else 'no'}
 - Phone present: {'yes' if req.phone else 'no'}
@@ -126,7 +176,7 @@ async def profile_insights(req: ProfileInsightsRequest):
 - Experience entries: {', '.join(req.experience) if req.experience else 'none'}
 - Education entries: {', '.join(req.education) if req.education else 'none'}
 - Resume text:
-{req.resume_text or 'not provided'}
+{resume_text or 'not provided'}
 
 Rules:
 1) Keep each list concise (max 6 items).
@@ -144,7 +194,9 @@ Rules:
             json_mode=True,
             max_tokens=600,
         )
-        return json.loads(result)
+        with span("parse"):
+            body = validate_model_json(result)
+        return model_json_response(body)
     except AIServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message)
     except Exception:
@@ -0,0 +1,134 @@
+"""Per-request CPU of the stdlib vs orjson serialization paths.
+
+Run from fastapi-ai-backend/:  python scripts/bench_serialization.py [iterations]
+
+Each case times what a route does around the provider call: parse the request body into its
+pydantic model, then turn the model's JSON answer (or a route's dict result) into response
+bytes. The "stdlib" column is FastAPI's default path (json.loads body, json.loads model output,
+jsonable_encoder, JSONResponse); "fast" is services/fast_json.py.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from models.schemas import AdminInsightsRequest, ProfileInsightsRequest  # noqa: E402
+from services.fast_json import (  # noqa: E402
+    json_response,
+    model_json_response,
+    validate_model_json,
+)
+
+
+def admin_case():
+    snapshot = {
+        "total_users": 182_000,
+        "total_revenue": 1_250_000.5,
+        "top_consultants": [f"Consultant {index}" for index in range(200)],
+        "revenue_by_role": {f"Role {index}": index * 812.25 for index in range(400)},
+        "recent_job_descriptions": [
+            f"Job {index}: we need a motivated engineer to build data pipelines. " * 8
+            for index in range(300)
+        ],
+        "suspicious_signals": [f"signal {index}" for index in range(100)],
+    }
+    body = json.dumps({"provider": "openai", "snapshot": snapshot}).encode()
+    answer = json.dumps(
+        {
+            "platform_analytics_intelligence": {
+                "dropoff_analysis": [
+                    {"stage": f"stage {i}", "issue": "x" * 80, "impact": "high", "action": "y" * 80}
+                    for i in range(40)
+                ]
+            },
+            "risk_monitoring": {
+                "discriminatory_job_description_flags": [
+                    {"excerpt": "z" * 200, "reason": "r" * 60, "recommended_rewrite": "w" * 120}
+                    for _ in range(40)
+                ]
+            },
+        },
+        indent=2,
+    )
+    return "admin-ai/insights", AdminInsightsRequest, body, answer
+
+
+def resume_case():
+    request = {
+        "name": "Sam",
+        "skills": [f"skill {index}" for index in range(60)],
+        "experience": [f"Led project {index} delivering results" for index in range(40)],
+        "resume_text": "Built services and shipped features for customers. " * 400,
+    }
+    fields = (
+        "missing_critical_fields",
+        "suggested_certifications",
+        "suggested_skill_tags",
+        "suggested_industries",
+        "profile_strengths",
+        "next_actions",
+    )
+    answer = json.dumps({key: [f"{key} item {index}" for index in range(6)] for key in fields})
+    return "resume/profile-insights", ProfileInsightsRequest, json.dumps(request).encode(), answer
+
+
+def stdlib_path(model, body, answer):
+    model.model_validate(json.loads(body))
+    return JSONResponse(jsonable_encoder(json.loads(answer))).body
+
+
+def fast_path(model, body, answer):
+    model.model_validate(orjson.loads(body))
+    return model_json_response(validate_model_json(answer)).body
+
+
+def dict_stdlib_path(result):
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+def dict_fast_path(result):
+    return json_response(result).body
+
+
+def cpu_per_call(function, args, iterations):
+    function(*args)
+    start = time.process_time()
+    for _ in range(iterations):
+        function(*args)
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    rows = []
+    for name, model, body, answer in (admin_case(), resume_case()):
+        rows.append(
+            (
+                name,
+                cpu_per_call(stdlib_path, (model, body, answer), iterations),
+                cpu_per_call(fast_path, (model, body, answer), iterations),
+            )
+        )
+    matches = {"matches": [{"id": f"c{index}", "similarity": 0.5} for index in range(500)]}
+    rows.append(
+        (
+            "match (dict result)",
+            cpu_per_call(dict_stdlib_path, (matches,), iterations),
+            cpu_per_call(dict_fast_path, (matches,), iterations),
+        )
+    )
+
+    print(f"{'case':<26}{'stdlib us':>12}{'fast us':>12}{'saved':>9}")
+    for name, slow, fast in rows:
+        print(f"{name:<26}{slow:>12.1f}{fast:>12.1f}{1 - fast / slow:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+
+def check_admin_secret(x_admin_ai_secret: Optional[str]) -> None:
+    """Reject the call unless it carries ADMIN_AI_SHARED_SECRET (when one is configured)."""
+    required_secret = os.getenv("ADMIN_AI_SHARED_SECRET")
+    if required_secret and x_admin_ai_secret != required_secret:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+async def require_admin_secret(x_admin_ai_secret: Optional[str] = Header(default=None)) -> None:
+    check_admin_secret(x_admin_ai_secret)
@@ -1,10 +1,14 @@
+import json
 import os
-from typing import Optional
+from typing import List, Optional
 
 from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
 
+from services.token_budget import estimate_tokens, fit_max_tokens
+from services.tracing import span
+
 load_dotenv()
 
 
@@ -58,24 +62,75 @@ async def ask_ai(
     json_mode: bool = False,
     temperature: float = 0.7,
 ) -> str:
+    variants = await ask_ai_variants(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        provider=provider,
+        model=model,
+        max_tokens=max_tokens,
+        json_mode=json_mode,
+        temperature=temperature,
+    )
+    return variants[0]
+
+
+def _parse_claude_variants(text: str, n: int) -> List[str]:
+    try:
+        parsed = json.loads(_clean_json_string(text))
+        variants = parsed.get("variants") if isinstance(parsed, dict) else parsed
+    except ValueError:
+        variants = None
+    cleaned = []
+    if isinstance(variants, list):
+        cleaned = [str(variant).strip() for variant in variants if str(variant).strip()]
+    if not cleaned:
+        raise AIServiceError("Claude returned invalid variants JSON", status_code=502)
+    return cleaned[:n]
+
+
+async def ask_ai_variants(
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+    max_tokens: int = 800,
+    json_mode: bool = False,
+    temperature: float = 0.7,
+    n: int = 1,
+) -> List[str]:
+    """Generate `n` alternative answers from a single provider call.
+
+    OpenAI returns them as separate choices. Claude has no equivalent, so it is asked for a
+    JSON list of distinct versions in one message. `max_tokens` is the budget per variant,
+    capped to what the prompt leaves of the model's context window.
+    """
+    if n > 1 and json_mode:
+        raise AIServiceError("Multiple variants are not supported with json_mode.")
+
     selected_provider = (provider or os.getenv("DEFAULT_AI_PROVIDER") or "openai").lower()
 
     if selected_provider == "openai":
         openai_client = _get_openai_client()
         selected_model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         response_format = {"type": "json_object"} if json_mode else {"type": "text"}
+        max_tokens = fit_max_tokens(
+            selected_model, estimate_tokens(system_prompt) + estimate_tokens(user_prompt), max_tokens
+        )
         try:
-            response = await openai_client.chat.completions.create(
-                model=selected_model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                response_format=response_format,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-            )
-            return (response.choices[0].message.content or "").strip()
+            with span("provider"):
+                response = await openai_client.chat.completions.create(
+                    model=selected_model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    response_format=response_format,
+                    n=n,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                )
+            return [(choice.message.content or "").strip() for choice in response.choices]
         except Exception as exc:
             raise AIServiceError(
                 f"OpenAI request failed: {str(exc)}",
@@ -90,25 +145,40 @@ async def ask_ai(
                 f"{user_prompt}\n\nReturn ONLY valid JSON. "
                 "No markdown, no explanation outside JSON."
             )
-        try:
-            response = await anthropic_client.messages.create(
-                model=selected_model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_prompt}],
+        if n > 1:
+            user_prompt = (
+                f"{user_prompt}\n\nWrite {n} distinct alternative versions. "
+                'Return ONLY valid JSON: {"variants": ["version 1", "version 2"]}. '
+                "No markdown, no explanation outside JSON."
             )
+        output_tokens = fit_max_tokens(
+            selected_model,
+            estimate_tokens(system_prompt) + estimate_tokens(user_prompt),
+            max_tokens * n,
+        )
+        try:
+            with span("provider"):
+                response = await anthropic_client.messages.create(
+                    model=selected_model,
+                    max_tokens=output_tokens,
+                    temperature=temperature,
+                    system=system_prompt,
+                    messages=[{"role": "user", "content": user_prompt}],
+                )
 
             text_chunks = [
                 block.text
                 for block in response.content
                 if hasattr(block, "type") and block.type == "text"
             ]
-            return _clean_json_string("".join(text_chunks))
+            text = "".join(text_chunks)
         except Exception as exc:
             raise AIServiceError(
                 f"Claude request failed: {str(exc)}",
                 status_code=_status_from_exception(exc),
             )
+        if n > 1:
+            return _parse_claude_variants(text, n)
+        return [_clean_json_string(text)]
 
     raise AIServiceError("Unsupported provider. Use 'openai' or 'claude'.")
@@ -0,0 +1,447 @@
+"""Build a PlatformAnalyticsSnapshot from raw platform events.
+
+Events arrive as NDJSON (one object per line) or CSV (one row per event, with a header).
+Every event has a `type` and a `timestamp` (ISO 8601 or epoch seconds); the other fields
+used per type are:
+
+- `user`: `segment`
+- `booking`: `consultant`, `status` (`completed`, `cancelled`, ...), `segment`
+- `revenue`: `amount`, `role`
+- `consultant_application`: `status` (`pending`, ...)
+- `job_application`: `status` (`hired`, ...), `industry`
+- `job_post`: `employer`, `industry`, `description`
+- `funnel`: `stage`, optional `step` to order stages
+- `login`: `user_id`, `success`
+
+Events are read in chunks and folded into fixed-size NumPy accumulators (per category and
+per day), so memory grows with the number of distinct consultants, roles, days, etc. and
+not with the number of events. Parsing and folding run in the threadpool, one received
+chunk at a time, so a large upload does not block the event loop; bodies larger than
+AI_EVENTS_MAX_BYTES are rejected.
+"""
+
+import csv
+import heapq
+import io
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from models.schemas import PlatformAnalyticsSnapshot
+
+CHUNK_SIZE = 10_000
+MAX_BODY_BYTES = int(os.getenv("AI_EVENTS_MAX_BYTES", str(200 * 1024 * 1024)))
+SECONDS_PER_DAY = 86_400
+WINDOW_DAYS = 30
+RECENT_JOB_DESCRIPTIONS = 20
+TOP_N = 5
+FAILED_LOGIN_THRESHOLD = 5
+EVENT_TYPES = (
+    "user",
+    "booking",
+    "revenue",
+    "consultant_application",
+    "job_application",
+    "job_post",
+    "funnel",
+    "login",
+)
+
+_TZ_OFFSET = re.compile(r"T.*[+-]\d{2}:?\d{2}$")
+
+
+class _Interner:
+    """Maps category strings to dense integer codes for bincount-style group-bys."""
+
+    def __init__(self) -> None:
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def encode(self, values: Iterable) -> np.ndarray:
+        codes = self.codes
+        out = []
+        for value in values:
+            key = str(value) if value not in (None, "") else "unknown"
+            code = codes.get(key)
+            if code is None:
+                code = codes[key] = len(self.names)
+                self.names.append(key)
+            out.append(code)
+        return np.asarray(out, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def _grow(acc: np.ndarray, size: int, fill=0) -> np.ndarray:
+    if len(acc) >= size:
+        return acc
+    return np.concatenate([acc, np.full(size - len(acc), fill, dtype=acc.dtype)])
+
+
+def _add_counts(acc: np.ndarray, codes: np.ndarray, size: int, weights=None) -> np.ndarray:
+    acc = _grow(acc, size)
+    if len(codes):
+        acc[:size] += np.bincount(codes, weights=weights, minlength=size).astype(acc.dtype)
+    return acc
+
+
+def _add_daily(totals: Dict[int, float], timestamps: np.ndarray, weights=None) -> None:
+    if not len(timestamps):
+        return
+    days, inverse = np.unique(timestamps // SECONDS_PER_DAY, return_inverse=True)
+    sums = np.bincount(inverse, weights=weights)
+    for day, value in zip(days.tolist(), sums.tolist()):
+        totals[int(day)] = totals.get(int(day), 0.0) + value
+
+
+def _to_epoch_seconds(values: List) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    texts = [str(value).strip().removesuffix("Z") for value in values]
+    try:
+        if any(_TZ_OFFSET.search(text) for text in texts):
+            raise ValueError("timezone offsets need per-value parsing")
+        return np.asarray(texts, dtype="datetime64[s]").astype(np.int64).astype(np.float64)
+    except ValueError:
+        out = np.empty(len(values), dtype=np.float64)
+        for index, value in enumerate(values):
+            try:
+                out[index] = float(value)
+            except (TypeError, ValueError):
+                parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+                if parsed.tzinfo is None:
+                    parsed = parsed.replace(tzinfo=timezone.utc)
+                out[index] = parsed.timestamp()
+        return out
+
+
+def _to_float(values: List) -> np.ndarray:
+    out = np.zeros(len(values), dtype=np.float64)
+    for index, value in enumerate(values):
+        try:
+            out[index] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+def _truthy(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def _growth_pct(daily: Dict[int, float], as_of_day: int) -> float:
+    if not daily:
+        return 0.0
+    days = np.fromiter(daily.keys(), dtype=np.int64, count=len(daily))
+    values = np.fromiter(daily.values(), dtype=np.float64, count=len(daily))
+    current = values[(days > as_of_day - WINDOW_DAYS) & (days <= as_of_day)].sum()
+    previous = values[(days > as_of_day - 2 * WINDOW_DAYS) & (days <= as_of_day - WINDOW_DAYS)].sum()
+    if not previous:
+        return 100.0 if current else 0.0
+    return round(float((current - previous) / previous * 100), 1)
+
+
+class SnapshotAggregator:
+    def __init__(self) -> None:
+        self.consultants = _Interner()
+        self.roles = _Interner()
+        self.industries = _Interner()
+        self.employers = _Interner()
+        self.stages = _Interner()
+        self.segments = _Interner()
+        self.failed_login_users = _Interner()
+
+        self.total_users = 0
+        self.total_bookings = 0
+        self.completed_bookings = 0
+        self.cancelled_bookings = 0
+        self.total_revenue = 0.0
+        self.pending_applications = 0
+        self.job_applications = 0
+        self.hires = 0
+        self.max_timestamp = float("-inf")
+
+        self.consultant_completed = np.zeros(0, dtype=np.int64)
+        self.consultant_last_booking = np.zeros(0, dtype=np.float64)
+        self.revenue_by_role = np.zeros(0, dtype=np.float64)
+        self.industry_demand = np.zeros(0, dtype=np.int64)
+        self.employer_posts = np.zeros(0, dtype=np.int64)
+        self.stage_counts = np.zeros(0, dtype=np.int64)
+        self.stage_steps: Dict[int, float] = {}
+        self.segment_users = np.zeros(0, dtype=np.int64)
+        self.segment_bookings = np.zeros(0, dtype=np.int64)
+        self.failed_logins = np.zeros(0, dtype=np.int64)
+        self.booking_days: Dict[int, float] = {}
+        self.revenue_days: Dict[int, float] = {}
+        self._recent_posts: List[tuple] = []
+        self._post_sequence = 0
+
+    def add(self, events: Iterable[dict]) -> None:
+        """Fold events into the aggregate, CHUNK_SIZE at a time."""
+        chunk: List[dict] = []
+        for event in events:
+            chunk.append(event)
+            if len(chunk) >= CHUNK_SIZE:
+                self._add_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._add_chunk(chunk)
+
+    def _add_chunk(self, events: List[dict]) -> None:
+        by_type: Dict[str, List[dict]] = {}
+        for event in events:
+            by_type.setdefault(str(event.get("type", "")), []).append(event)
+
+        for event_type, rows in by_type.items():
+            if event_type not in EVENT_TYPES:
+                continue
+            handler = getattr(self, f"_add_{event_type}")
+            timestamps = _to_epoch_seconds([row.get("timestamp") or 0 for row in rows])
+            if len(timestamps):
+                self.max_timestamp = max(self.max_timestamp, float(timestamps.max()))
+            handler(rows, timestamps)
+
+    def _add_user(self, rows: List[dict], timestamps: np.ndarray) -> None:
+        self.total_users += len(rows)
+        codes = self.segments.encode(row.get("segment") for row in rows)
+        self.segment_users = _add_counts(self.segment_users, codes, len(self.segments))
+
+    def _add_booking(self, rows: List[dict], timestamps: np.ndarray) -> None:
+        statuses = np.asarray([str(row.get("status", "")).lower() for row in rows])
+        completed = statuses == "completed"
+        self.total_bookings += len(rows)
+        self.completed_bookings += int(completed.sum())
+        self.cancelled_bookings += int((statuses == "cancelled").sum())
+        _add_daily(self.booking_days, timestamps)
+
+        codes = self.consultants.encode(row.get("consultant") for row in rows)
+        size = len(self.consultants)
+        self.consultant_completed = _add_counts(self.consultant_completed, codes[completed], size)
+        self.consultant_last_booking = _grow(self.consultant_last_booking, size, fill=float("-inf"))
+        np.maximum.at(self.consultant_last_booking, codes, timestamps)
+
+        segments = self.segments.encode(row.get("segment") for row in rows)
+        self.segment_bookings = _add_counts(self.segment_bookings, segments, len(self.segments))
+
+    def _add_revenue(self, rows: List[dict], timestamps: np.ndarray) -> None:
+        amounts = _to_float([row.get("amount") for row in rows])
+        self.total_revenue += float(amounts.sum())
+        _add_daily(self.revenue_days, timestamps, weights=amounts)
+        codes = self.roles.encode(row.get("role") for row in rows)
+        self.revenue_by_role = _add_counts(self.revenue_by_role, codes, len(self.roles), weights=amounts)
+
+    def _add_consultant_application(self, rows: List[dict], timestamps: np.ndarray) -> None:
+        self.pending_applications += sum(
+            1 for row in rows if str(row.get("status", "")).lower() == "pending"
+        )
+
+    def _add_job_application(self, rows: List[dict], timestamps: np.ndarray) -> None:
+        self.job_applications += len(rows)
+        self.hires += sum(1 for row in rows if str(row.get("status", "")).lower() == "hired")
+        codes = self.industries.encode(row.get("industry") for row in rows)
+        self.industry_demand = _add_counts(self.industry_demand, codes, len(self.industries))
+
+    def _add_job_post(self, rows: List[dict], timestamps: np.ndarray) -> None:
+        codes = self.industries.encode(row.get("industry") for row in rows)
+        self.industry_demand = _add_counts(self.industry_demand, codes, len(self.industries))
+        employers = self.employers.encode(row.get("employer") for row in rows)
+        self.employer_posts = _add_counts(self.employer_posts, employers, len(self.employers))
+
+        for row, timestamp in zip(rows, timestamps.tolist()):
+            description = row.get("description")
+            if not description:
+                continue
+            self._post_sequence += 1
+            item = (timestamp, self._post_sequence, str(description))
+            if len(self._recent_posts) < RECENT_JOB_DESCRIPTIONS:
+                heapq.heappush(self._recent_posts, item)
+            elif item > self._recent_posts[0]:
+                heapq.heapreplace(self._recent_posts, item)
+
+    def _add_funnel(self, rows: List[dict], timestamps: np.ndarray) -> None:
+        codes = self.stages.encode(row.get("stage") for row in rows)
+        self.stage_counts = _add_counts(self.stage_counts, codes, len(self.stages))
+        for code, row in zip(codes.tolist(), rows):
+            if code not in self.stage_steps:
+                step = row.get("step")
+                self.stage_steps[code] = float(step) if step not in (None, "") else float(code)
+
+    def _add_login(self, rows: List[dict], timestamps: np.ndarray) -> None:
+        failed = [row.get("user_id") for row in rows if not _truthy(row.get("success", True))]
+        codes = self.failed_login_users.encode(failed)
+        self.failed_logins = _add_counts(self.failed_logins, codes, len(self.failed_login_users))
+
+    def _top(self, counts: np.ndarray, names: List[str]) -> List[str]:
+        order = np.argsort(-counts, kind="stable")[:TOP_N]
+        return [names[index] for index in order.tolist() if counts[index] > 0]
+
+    def _dropoff_points(self) -> List[str]:
+        if len(self.stages) < 2:
+            return []
+        order = sorted(range(len(self.stages)), key=lambda code: self.stage_steps[code])
+        counts = self.stage_counts[order].astype(np.float64)
+        previous, following = counts[:-1], counts[1:]
+        drop = np.divide(previous - following, previous, out=np.zeros_like(previous), where=previous > 0)
+        points = []
+        for index in np.argsort(-drop, kind="stable")[:3].tolist():
+            if drop[index] < 0.2:
+                break
+            points.append(
+                f"{self.stages.names[order[index]]} -> {self.stages.names[order[index + 1]]}: "
+                f"{drop[index]:.0%} drop-off ({int(previous[index])} -> {int(following[index])})"
+            )
+        return points
+
+    def _suspicious_signals(self) -> List[str]:
+        if not len(self.employer_posts):
+            return []
+        median = float(np.median(self.employer_posts))
+        threshold = max(10.0, 3 * median)
+        flagged = np.flatnonzero(self.employer_posts > threshold)
+        flagged = flagged[np.argsort(-self.employer_posts[flagged], kind="stable")][:10]
+        return [
+            f"Employer {self.employers.names[index]} posted {int(self.employer_posts[index])} jobs "
+            f"(platform median {median:g})"
+            for index in flagged.tolist()
+        ]
+
+    def _abnormal_activity_signals(self) -> List[str]:
+        flagged = int((self.failed_logins >= FAILED_LOGIN_THRESHOLD).sum())
+        if not flagged:
+            return []
+        return [f"{flagged} accounts with {FAILED_LOGIN_THRESHOLD}+ failed logins"]
+
+    def _underserved_segments(self) -> List[str]:
+        size = len(self.segments)
+        users = _grow(self.segment_users, size).astype(np.float64)
+        bookings = _grow(self.segment_bookings, size).astype(np.float64)
+        if not users.sum():
+            return []
+        overall = bookings.sum() / users.sum()
+        ratio = np.divide(bookings, users, out=np.zeros_like(users), where=users > 0)
+        candidates = np.flatnonzero((users >= 10) & (ratio < 0.5 * overall))
+        candidates = candidates[np.argsort(ratio[candidates], kind="stable")][:TOP_N]
+        return [self.segments.names[index] for index in candidates.tolist()]
+
+    def snapshot(self, as_of: Optional[float] = None) -> PlatformAnalyticsSnapshot:
+        """Compute the snapshot as of `as_of` (epoch seconds, default: latest event)."""
+        if as_of is None:
+            as_of = self.max_timestamp
+            if as_of == float("-inf"):
+                as_of = datetime.now(timezone.utc).timestamp()
+        as_of_day = int(as_of // SECONDS_PER_DAY)
+        month_start = datetime.fromtimestamp(as_of, tz=timezone.utc).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        month_start_day = int(month_start.timestamp() // SECONDS_PER_DAY)
+
+        active_since = as_of - WINDOW_DAYS * SECONDS_PER_DAY
+        return PlatformAnalyticsSnapshot(
+            total_users=self.total_users,
+            active_consultants=int((self.consultant_last_booking >= active_since).sum()),
+            total_bookings=self.total_bookings,
+            completed_bookings=self.completed_bookings,
+            cancelled_bookings=self.cancelled_bookings,
+            total_revenue=round(self.total_revenue, 2),
+            revenue_this_month=round(
+                sum(value for day, value in self.revenue_days.items() if month_start_day <= day <= as_of_day),
+                2,
+            ),
+            bookings_growth_pct=_growth_pct(self.booking_days, as_of_day),
+            revenue_growth_pct=_growth_pct(self.revenue_days, as_of_day),
+            pending_applications=self.pending_applications,
+            top_consultants=self._top(self.consultant_completed, self.consultants.names),
+            placement_rate_pct=(
+                round(self.hires / self.job_applications * 100, 1) if self.job_applications else None
+            ),
+            revenue_by_role={
+                name: round(float(value), 2)
+                for name, value in zip(self.roles.names, self.revenue_by_role.tolist())
+            },
+            dropoff_points=self._dropoff_points(),
+            suspicious_signals=self._suspicious_signals(),
+            recent_job_descriptions=[item[2] for item in sorted(self._recent_posts, reverse=True)],
+            abnormal_activity_signals=self._abnormal_activity_signals(),
+            high_demand_industries=self._top(self.industry_demand, self.industries.names),
+            underserved_segments=self._underserved_segments(),
+        )
+
+
+def _parse_ndjson(lines: Iterable[str]) -> Iterator[dict]:
+    for line in lines:
+        if line.strip():
+            event = json.loads(line)
+            if not isinstance(event, dict):
+                raise ValueError(f"Expected a JSON object per line, got {type(event).__name__}")
+            yield event
+
+
+class EventBodyTooLarge(ValueError):
+    pass
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    pending = b""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > MAX_BODY_BYTES:
+            raise EventBodyTooLarge(f"Event body exceeds {MAX_BODY_BYTES} bytes")
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        if lines:
+            yield [line.decode("utf-8") for line in lines]
+    if pending:
+        yield [pending.decode("utf-8")]
+
+
+def _complete_csv_records(lines: List[str]) -> int:
+    """Number of leading lines that end outside a quoted field (quoted newlines span lines)."""
+    complete = 0
+    inside_quotes = False
+    for index, line in enumerate(lines):
+        if line.count('"') % 2:
+            inside_quotes = not inside_quotes
+        if not inside_quotes:
+            complete = index + 1
+    return complete
+
+
+async def aggregate_stream(
+    chunks: AsyncIterator[bytes], *, content_type: str = "application/x-ndjson"
+) -> PlatformAnalyticsSnapshot:
+    """Aggregate a streamed NDJSON or CSV (`text/csv`) body into a snapshot."""
+    aggregator = SnapshotAggregator()
+    header: Optional[List[str]] = None
+    is_csv = "csv" in content_type
+    carry: List[str] = []
+
+    async for lines in _iter_lines(chunks):
+        if not is_csv:
+            await run_in_threadpool(aggregator.add, _parse_ndjson(lines))
+            continue
+        lines = carry + lines
+        complete = _complete_csv_records(lines)
+        lines, carry = lines[:complete], lines[complete:]
+        rows = csv.reader(io.StringIO("\n".join(lines)))
+        if header is None:
+            header = next(rows, None)
+        if header is not None:
+            records = (dict(zip(header, row)) for row in rows if row)
+            await run_in_threadpool(aggregator.add, records)
+
+    if carry:
+        raise ValueError("CSV body ends inside a quoted field")
+    return await run_in_threadpool(aggregator.snapshot)
@@ -0,0 +1,202 @@
+"""Local, LLM-free scanner for biased or exclusionary phrasing in job descriptions.
+
+All lexicon entries are compiled into a single case-insensitive alternation. Each entry is
+wrapped in one capturing group (entries themselves only use non-capturing groups), so
+`match.lastindex` identifies which entry matched without re-testing the others.
+"""
+
+import re
+from typing import Iterable, List, NamedTuple
+
+CONTEXT_CHARS = 60
+
+# (pattern, category, reason, recommended rewrite)
+LEXICON = [
+    (
+        r"young(?:er)? (?:and )?(?:energetic|dynamic|candidates?|team|people|professionals?)",
+        "age",
+        "Signals a preference for younger candidates.",
+        "motivated, energetic",
+    ),
+    (
+        r"digital natives?",
+        "age",
+        "Implies candidates should be young.",
+        "comfortable with digital tools",
+    ),
+    (
+        r"recent (?:college |university )?grad(?:uate)?s? only",
+        "age",
+        "Excludes experienced and older candidates.",
+        "open to candidates at all career stages",
+    ),
+    (
+        r"fresh blood",
+        "age",
+        "Implies candidates should be young.",
+        "new perspectives",
+    ),
+    (
+        # Bare "under 30" is usually minutes or dollars, so it needs an age noun.
+        r"(?:no older than|not older than|maximum age(?: of)?|max\.? age) \d{2}"
+        r"|(?:under|below) (?:the age of \d{2}|\d{2} (?:years? (?:old|of age)|yrs? old|y/?o))",
+        "age",
+        "Sets an age limit.",
+        "remove the age requirement",
+    ),
+    (
+        r"\d{2}\s*(?:-|to)\s*\d{2} years? old",
+        "age",
+        "Sets an age range.",
+        "remove the age requirement",
+    ),
+    (
+        r"overqualified",
+        "age",
+        "Often used to screen out older candidates.",
+        "describe the actual skills needed",
+    ),
+    (
+        r"(?:males?|men|females?|women|ladies|gentlemen) only",
+        "gender",
+        "Restricts the role to one gender.",
+        "all qualified candidates",
+    ),
+    (
+        r"salesm[ae]n|chairm[ae]n|forem[ae]n|workm[ae]n|manpower",
+        "gender",
+        "Gendered job title or term.",
+        "salesperson, chair, supervisor, worker, workforce",
+    ),
+    (
+        r"waitress(?:es)?|stewardess(?:es)?",
+        "gender",
+        "Gendered job title.",
+        "server, flight attendant",
+    ),
+    (
+        r"girl friday|strong man|handyman",
+        "gender",
+        "Gendered phrasing.",
+        "assistant, strong lifter, maintenance technician",
+    ),
+    (
+        r"not pregnant|no pregnan\w+|planning (?:a family|to have children)",
+        "pregnancy",
+        "Screens on pregnancy or family planning.",
+        "remove the requirement",
+    ),
+    (
+        r"no (?:kids|children)|childless|single (?:applicants?|candidates?) only"
+        r"|unmarried|no family commitments",
+        "family_status",
+        "Screens on marital or family status.",
+        "describe schedule requirements instead",
+    ),
+    (
+        r"able[- ]bodied|no disabilit(?:y|ies)|perfect (?:physical )?health"
+        r"|mentally (?:stable|sound)|physically fit",
+        "disability",
+        "Excludes people with disabilities.",
+        "able to perform the essential functions, with or without reasonable accommodation",
+    ),
+    (
+        r"native (?:english )?speakers?|accent[- ]free|no accents?|mother tongue",
+        "national_origin",
+        "Excludes non-native speakers regardless of proficiency.",
+        "fluent in English",
+    ),
+    (
+        r"(?:american|us|u\.s\.)[- ]born|no foreigners|no immigrants|locals? only",
+        "national_origin",
+        "Discriminates on national origin.",
+        "authorized to work in the country",
+    ),
+    (
+        r"christians? only|must attend church"
+        r"|(?:christian|muslim|jewish|hindu) (?:values|environment|workplace)",
+        "religion",
+        "Screens on religion.",
+        "remove the religious requirement",
+    ),
+    (
+        r"cultur(?:al|e) fit|clean[- ]cut|well[- ]spoken",
+        "coded_language",
+        "Vague criteria that often mask racial or class bias.",
+        "name the specific skills or values required",
+    ),
+    (
+        # "attractive salary/benefits" is common, so only appearance contexts count.
+        r"(?:physically|must be|should be) attractive"
+        r"|attractive (?:candidates?|applicants?|individuals?|people|person|women|men|females?"
+        r"|males?|girls?|guys?|appearance|looks?)"
+        r"|good[- ]looking|pleasant appearance|height and weight requirements?",
+        "appearance",
+        "Screens on appearance.",
+        "professional presentation, if relevant to the role",
+    ),
+    (
+        r"no (?:felons|ex[- ]?offenders|ex[- ]?cons|criminal (?:records?|history|background))"
+        r"|clean (?:criminal )?record|(?:felons|ex[- ]?offenders) need not apply",
+        "criminal_history",
+        "Blanket exclusion of people with records; conflicts with fair-chance hiring.",
+        "background checks are reviewed individually, in line with fair-chance laws",
+    ),
+]
+
+_PATTERN = re.compile(
+    "|".join(rf"\b({pattern})\b" for pattern, _, _, _ in LEXICON),
+    re.IGNORECASE,
+)
+
+
+class BiasFlag(NamedTuple):
+    index: int
+    phrase: str
+    category: str
+    reason: str
+    recommended_rewrite: str
+    excerpt: str
+
+
+def _excerpt(text: str, start: int, end: int) -> str:
+    left = max(0, start - CONTEXT_CHARS)
+    right = min(len(text), end + CONTEXT_CHARS)
+    if left > 0:
+        space = text.find(" ", left, start)
+        left = space + 1 if space != -1 else left
+    if right < len(text):
+        space = text.rfind(" ", end, right)
+        right = space if space != -1 else right
+    snippet = " ".join(text[left:right].split())
+    return f"{'...' if left > 0 else ''}{snippet}{'...' if right < len(text) else ''}"
+
+
+def scan_text(text: str, index: int = 0) -> List[BiasFlag]:
+    """Flag lexicon matches in one description, once per distinct phrase."""
+    flags: List[BiasFlag] = []
+    seen = set()
+    for match in _PATTERN.finditer(text):
+        phrase = match.group(match.lastindex).lower()
+        if phrase in seen:
+            continue
+        seen.add(phrase)
+        _, category, reason, rewrite = LEXICON[match.lastindex - 1]
+        flags.append(
+            BiasFlag(
+                index=index,
+                phrase=phrase,
+                category=category,
+                reason=reason,
+                recommended_rewrite=rewrite,
+                excerpt=_excerpt(text, match.start(), match.end()),
+            )
+        )
+    return flags
+
+
+def scan_descriptions(descriptions: Iterable[str]) -> List[BiasFlag]:
+    flags: List[BiasFlag] = []
+    for index, text in enumerate(descriptions):
+        flags.extend(scan_text(text, index))
+    return flags
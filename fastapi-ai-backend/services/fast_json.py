@@ -0,0 +1,56 @@
+"""orjson-backed request parsing and response rendering.
+
+Returning a plain dict from a route makes FastAPI walk it with `jsonable_encoder` and then
+encode it with the stdlib `json`; returning a response object skips both. Routes therefore
+return `json_response(...)`, and json_mode model output, which is already JSON text, is
+checked once with orjson and sent as-is by `model_json_response(...)` instead of being
+decoded into Python objects and encoded again.
+"""
+
+from typing import Any, Callable, Coroutine, Mapping, Optional
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+
+
+class RawJSONResponse(Response):
+    """Body bytes that are already valid JSON."""
+
+    media_type = "application/json"
+
+
+def json_response(content: Any, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return ORJSONResponse(content, headers=headers)
+
+
+def validate_model_json(text: str) -> bytes:
+    """UTF-8 bytes of model output, raising ValueError unless it is a JSON object."""
+    body = text.encode()
+    if not isinstance(orjson.loads(body), dict):
+        raise ValueError("Expected a JSON object")
+    return body
+
+
+def model_json_response(body: bytes, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return RawJSONResponse(body, headers=headers)
+
+
+class _ORJSONRequest(Request):
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class FastJSONRoute(APIRoute):
+    """Parses JSON request bodies with orjson before pydantic validation."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(_ORJSONRequest(request.scope, request.receive))
+
+        return route_handler
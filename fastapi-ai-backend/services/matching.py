@@ -0,0 +1,190 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from models.schemas import MatchCandidate, MatchJob
+from services.ai_service import ask_ai
+from services.text_vectors import hashed_counts, word_tokens
+from services.tracing import span
+from services.vector_index import VectorIndex
+
+INDEX_DIR = os.getenv("AI_MATCH_INDEX_DIR") or os.path.join(
+    tempfile.gettempdir(), "tray-match-index"
+)
+LABEL_CHARS = 600
+
+_lock = threading.Lock()
+_indexes: Dict[str, VectorIndex] = {}
+
+
+def get_index(kind: str) -> VectorIndex:
+    """Open (once per process) the "candidates" or "jobs" index."""
+    with _lock:
+        if kind not in _indexes:
+            _indexes[kind] = VectorIndex(os.path.join(INDEX_DIR, kind))
+        return _indexes[kind]
+
+
+def candidate_text(candidate: MatchCandidate) -> str:
+    # Skills and target role are repeated so they weigh more than free text.
+    skills = ", ".join(candidate.skills)
+    return "\n".join(
+        [
+            candidate.target_role or "",
+            candidate.target_role or "",
+            skills,
+            skills,
+            ", ".join(candidate.certifications),
+            "\n".join(candidate.experience),
+            "\n".join(candidate.education),
+            candidate.location or "",
+            candidate.resume_text or "",
+        ]
+    )
+
+
+def job_text(job: MatchJob) -> str:
+    skills = ", ".join(job.required_skills)
+    return "\n".join(
+        [
+            job.role_title,
+            job.role_title,
+            skills,
+            skills,
+            ", ".join(job.nice_to_have),
+            "\n".join(job.responsibilities),
+            f"{job.experience_level or ''} {job.job_type or ''}",
+            job.location or "",
+            job.job_post or "",
+        ]
+    )
+
+
+def _label(text: str) -> str:
+    return " ".join(text.split())[:LABEL_CHARS]
+
+
+def vectorize(text: str) -> np.ndarray:
+    return hashed_counts(word_tokens(text))
+
+
+def index_candidates(candidates: List[MatchCandidate]) -> int:
+    items = []
+    for candidate in candidates:
+        text = candidate_text(candidate)
+        items.append((candidate.id, vectorize(text), _label(text)))
+    get_index("candidates").upsert(items)
+    return len(items)
+
+
+def index_jobs(jobs: List[MatchJob]) -> int:
+    items = []
+    for job in jobs:
+        text = job_text(job)
+        items.append((job.id, vectorize(text), _label(text)))
+    get_index("jobs").upsert(items)
+    return len(items)
+
+
+async def _rerank(
+    query_label: str,
+    shortlist: List[Tuple[str, float]],
+    labels: Dict[str, str],
+    provider: Optional[str],
+    model: Optional[str],
+) -> List[dict]:
+    system = (
+        "You are an expert recruiter. Rank the listed profiles by fit for the target. "
+        "Return ONLY valid JSON: {\"ranking\": [{\"id\": \"id\", \"score\": 1-100, "
+        "\"reason\": \"short reason\"}]}, best first, using every id exactly once."
+    )
+    entries = "\n".join(f"- id={item_id}: {labels.get(item_id, '')}" for item_id, _ in shortlist)
+    user = f"Target:\n{query_label}\n\nShortlist:\n{entries}"
+
+    result = await ask_ai(
+        system_prompt=system,
+        user_prompt=user,
+        provider=provider,
+        model=model,
+        json_mode=True,
+        max_tokens=60 + 50 * len(shortlist),
+        temperature=0.2,
+    )
+    with span("parse"):
+        ranking = json.loads(result).get("ranking", [])
+
+    similarity = dict(shortlist)
+    ranked: List[dict] = []
+    for entry in ranking:
+        item_id = str(entry.get("id", "")) if isinstance(entry, dict) else ""
+        if item_id in similarity and all(item["id"] != item_id for item in ranked):
+            ranked.append(
+                {
+                    "id": item_id,
+                    "similarity": round(similarity[item_id], 4),
+                    "rerank_score": entry.get("score"),
+                    "reason": entry.get("reason"),
+                }
+            )
+    ranked_ids = {item["id"] for item in ranked}
+    ranked.extend(
+        {"id": item_id, "similarity": round(score, 4)}
+        for item_id, score in shortlist
+        if item_id not in ranked_ids
+    )
+    return ranked
+
+
+def _shortlist(
+    source_kind: str, source_id: str, target_kind: str, k: int
+) -> Optional[List[Tuple[str, float]]]:
+    vector = get_index(source_kind).vector(source_id)
+    if vector is None:
+        return None
+    return get_index(target_kind).search(vector, k=k)[0]
+
+
+def _labels(
+    source_kind: str, source_id: str, target_kind: str, shortlist: List[Tuple[str, float]]
+) -> Tuple[str, Dict[str, str]]:
+    target = get_index(target_kind)
+    labels = {item_id: target.label(item_id) for item_id, _ in shortlist}
+    return get_index(source_kind).label(source_id), labels
+
+
+async def find_matches(
+    source_kind: str,
+    source_id: str,
+    target_kind: str,
+    *,
+    k: int,
+    rerank: bool = False,
+    rerank_top: int = 10,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+) -> Optional[List[dict]]:
+    """Top-k items of `target_kind` for an indexed item of `source_kind`.
+
+    Candidates are shortlisted by vector similarity; the LLM, if asked, only re-orders the
+    first `rerank_top` of them. Returns None if `source_id` is not indexed.
+    """
+    # Index reads take a file lock and scan the matrix, so they run off the event loop.
+    with span("search"):
+        shortlist = await run_in_threadpool(_shortlist, source_kind, source_id, target_kind, k)
+    if shortlist is None:
+        return None
+
+    if not (rerank and shortlist):
+        return [{"id": item_id, "similarity": round(score, 4)} for item_id, score in shortlist]
+
+    head, tail = shortlist[:rerank_top], shortlist[rerank_top:]
+    query_label, labels = await run_in_threadpool(
+        _labels, source_kind, source_id, target_kind, head
+    )
+    ranked = await _rerank(query_label, head, labels, provider, model)
+    return ranked + [{"id": item_id, "similarity": round(score, 4)} for item_id, score in tail]
@@ -0,0 +1,202 @@
+"""Near-duplicate detection for job posts with MinHash signatures and LSH buckets.
+
+A post is reduced to hashed word shingles, then to a MinHash signature whose agreement
+rate with another signature estimates their Jaccard similarity. Signatures are split into
+bands; posts sharing any band bucket become candidates and are verified against the
+threshold, so a query touches only its buckets rather than every stored post.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+SHINGLE_WORDS = 3
+NUM_PERM = 128
+BANDS = 32
+DEFAULT_THRESHOLD = 0.6
+MAX_ITEMS = int(os.getenv("AI_DEDUP_MAX_POSTS", "10000"))
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.default_rng(20240601)
+_PERM_A = _rng.integers(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> np.ndarray:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[index : index + size]) for index in range(len(words) - size + 1)]
+    return np.unique(np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64))
+
+
+def minhash(text: str) -> np.ndarray:
+    """NUM_PERM-long MinHash signature using universal hashes (a*x + b) mod p."""
+    values = shingles(text)
+    hashed = (_PERM_A[:, None] * values[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return (hashed & _MAX_HASH).min(axis=1)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+def _band_keys(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    rows = len(signature) // BANDS
+    return [(band, signature[band * rows : (band + 1) * rows].tobytes()) for band in range(BANDS)]
+
+
+def content_id(text: str) -> str:
+    """Id of the exact text, ignoring only case and whitespace."""
+    return hashlib.sha256(" ".join(text.split()).lower().encode()).hexdigest()[:16]
+
+
+class NearDuplicateIndex:
+    """Incremental LSH index with greedy duplicate clusters and per-post stored results."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, max_items: int = MAX_ITEMS) -> None:
+        self.threshold = threshold
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._signatures: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self._cluster_of: Dict[str, str] = {}
+        self._clusters: Dict[str, Set[str]] = {}
+        self._results: Dict[str, Dict[Hashable, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _query(
+        self,
+        signature: np.ndarray,
+        exclude: Optional[str] = None,
+        threshold: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        threshold = self.threshold if threshold is None else threshold
+        candidates: Set[str] = set()
+        for key in _band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+        candidates.discard(exclude)
+        matches = [
+            (item_id, similarity(signature, self._signatures[item_id])) for item_id in candidates
+        ]
+        return sorted(
+            [match for match in matches if match[1] >= threshold],
+            key=lambda match: match[1],
+            reverse=True,
+        )
+
+    def query(self, text: str) -> List[Tuple[str, float]]:
+        """Stored posts at or above the similarity threshold, most similar first."""
+        signature = minhash(text)
+        with self._lock:
+            return self._query(signature)
+
+    def add(self, item_id: str, text: str) -> List[Tuple[str, float]]:
+        """Store a post and return its near-duplicates (excluding itself)."""
+        signature = minhash(text)
+        with self._lock:
+            duplicates = self._query(signature, exclude=item_id)
+            stored = self._signatures.get(item_id)
+            if stored is not None:
+                if np.array_equal(stored, signature):
+                    self._signatures.move_to_end(item_id)
+                    return duplicates
+                # The post was edited: re-index it and drop results of the old text.
+                self._evict(item_id)
+
+            self._signatures[item_id] = signature
+            for key in _band_keys(signature):
+                self._buckets.setdefault(key, set()).add(item_id)
+            cluster = self._cluster_of[duplicates[0][0]] if duplicates else item_id
+            self._cluster_of[item_id] = cluster
+            self._clusters.setdefault(cluster, set()).add(item_id)
+
+            while len(self._signatures) > self.max_items:
+                self._evict(next(iter(self._signatures)))
+            return duplicates
+
+    def _evict(self, item_id: str) -> None:
+        signature = self._signatures.pop(item_id)
+        for key in _band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._buckets[key]
+        cluster = self._cluster_of.pop(item_id)
+        members = self._clusters[cluster]
+        members.discard(item_id)
+        if not members:
+            del self._clusters[cluster]
+        elif cluster == item_id:
+            # Re-key the cluster so a re-added post with this id does not rejoin it.
+            del self._clusters[cluster]
+            new_cluster = min(members)
+            self._clusters[new_cluster] = members
+            for member in members:
+                self._cluster_of[member] = new_cluster
+        self._results.pop(item_id, None)
+
+    def cluster(self, item_id: str) -> List[str]:
+        with self._lock:
+            cluster = self._cluster_of.get(item_id)
+            return sorted(self._clusters.get(cluster, set())) if cluster else []
+
+    def clusters(self, min_size: int = 2) -> List[List[str]]:
+        with self._lock:
+            return [
+                sorted(members) for members in self._clusters.values() if len(members) >= min_size
+            ]
+
+    def stored_result(self, text: str, result_key: Hashable) -> Optional[Tuple[str, Any]]:
+        """A stored result for `result_key` from a post with the same text as `text`.
+
+        Only case and whitespace may differ: results such as extracted skills or a rewritten
+        post depend on every detail of the input ("C++" vs "C#", "5+ years"), and the index
+        is shared by all callers, so similar-but-different posts must not share them.
+        """
+        item_id = content_id(text)
+        with self._lock:
+            result = self._results.get(item_id, {}).get(result_key)
+            if result is None:
+                return None
+            self._signatures.move_to_end(item_id)
+            return item_id, result
+
+    def store_result(self, text: str, result_key: Hashable, result: Any) -> str:
+        item_id = content_id(text)
+        self.add(item_id, text)
+        with self._lock:
+            if item_id in self._signatures:
+                self._results.setdefault(item_id, {})[result_key] = result
+        return item_id
+
+
+def collapse_near_duplicates(
+    texts: List[str], threshold: float = DEFAULT_THRESHOLD
+) -> Tuple[List[str], List[List[int]]]:
+    """Keep the first of each group of near-duplicate texts.
+
+    Returns the kept texts and the index groups that were collapsed (size >= 2).
+    """
+    index = NearDuplicateIndex(threshold=threshold, max_items=max(len(texts), 1))
+    kept: List[str] = []
+    for position, text in enumerate(texts):
+        if not index.add(str(position), text):
+            kept.append(text)
+    groups = [sorted(int(member) for member in cluster) for cluster in index.clusters()]
+    return kept, groups
+
+
+job_posts = NearDuplicateIndex()
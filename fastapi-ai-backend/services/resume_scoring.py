@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from services.ai_service import AIServiceError, ask_ai
+from services.text_vectors import STOPWORDS
+from services.token_budget import ROUTE_BUDGETS, compress_text, estimate_tokens
+from services.tracing import span
+
+MAX_CACHED_SECTIONS = int(os.getenv("AI_SECTION_CACHE_SIZE", "4096"))
+DIGEST_FIRST_LINE_CHARS = 120
+DIGEST_KEY_TERMS = 8
+HEADER_BUDGET_SHARE = 0.1
+
+SECTION_ALIASES = {
+    "summary": ("summary", "profile", "objective", "about me", "professional summary"),
+    "experience": (
+        "experience",
+        "work experience",
+        "professional experience",
+        "employment",
+        "employment history",
+        "work history",
+    ),
+    "skills": ("skills", "technical skills", "core competencies", "competencies"),
+    "education": ("education", "academic background"),
+    "certifications": ("certifications", "certificates", "licenses", "licenses and certifications"),
+    "projects": ("projects", "personal projects"),
+    "awards": ("awards", "achievements", "honors"),
+    "volunteering": ("volunteer", "volunteering", "volunteer experience"),
+}
+SECTION_WEIGHTS = {"experience": 3.0, "skills": 2.0, "summary": 1.5, "education": 1.0}
+DEFAULT_SECTION_WEIGHT = 0.5
+
+_HEADING_LOOKUP = {
+    alias: canonical for canonical, aliases in SECTION_ALIASES.items() for alias in aliases
+}
+_HEADING_RE = re.compile(r"^[#*\s]*([A-Za-z][A-Za-z &/]{1,40}?)[\s:*#-]*$")
+
+_TERM_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#.]*[A-Za-z0-9+#]")
+
+_lock = threading.Lock()
+_section_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+
+def split_sections(resume_text: str) -> List[Tuple[str, str]]:
+    """Split a resume on recognised headings into (section, body) pairs.
+
+    Text before the first heading (name, contact details) is returned as the "header"
+    section; a resume without recognised headings is a single "resume" section. Repeated
+    headings get a numeric suffix so every section has a unique name.
+    """
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in resume_text.splitlines():
+        match = _HEADING_RE.match(line.strip())
+        canonical = _HEADING_LOOKUP.get(match.group(1).strip().lower()) if match else None
+        if canonical:
+            sections.append((canonical, []))
+        else:
+            sections[-1][1].append(line)
+
+    result: List[Tuple[str, str]] = []
+    seen: Dict[str, int] = {}
+    for name, lines in sections:
+        body = "\n".join(lines).strip()
+        if not body:
+            continue
+        seen[name] = seen.get(name, 0) + 1
+        result.append((name if seen[name] == 1 else f"{name}_{seen[name]}", body))
+    if len(result) == 1 and result[0][0] == "header":
+        return [("resume", result[0][1])]
+    return result or [("resume", resume_text.strip())]
+
+
+def section_digest(body: str) -> str:
+    """First line and most frequent terms of a section, as context for scoring others."""
+    first_line = next((line.strip() for line in body.splitlines() if line.strip()), "")
+    if len(first_line) > DIGEST_FIRST_LINE_CHARS:
+        first_line = first_line[:DIGEST_FIRST_LINE_CHARS].rsplit(" ", 1)[0] + "..."
+    terms = Counter(
+        term
+        for term in _TERM_RE.findall(body)
+        if len(term) > 2 and term.lower() not in STOPWORDS and term not in first_line
+    )
+    key_terms = ", ".join(term for term, _ in terms.most_common(DIGEST_KEY_TERMS))
+    return f'"{first_line}"' + (f"; key terms: {key_terms}" if key_terms else "")
+
+
+def _section_key(name: str, body: str, context: str) -> str:
+    return hashlib.sha256(f"{context}\n{name}\n{body}".encode()).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[dict]:
+    with _lock:
+        entry = _section_cache.get(key)
+        if entry is not None:
+            _section_cache.move_to_end(key)
+        return entry
+
+
+def _cache_put(key: str, entry: dict) -> None:
+    with _lock:
+        _section_cache[key] = entry
+        _section_cache.move_to_end(key)
+        while len(_section_cache) > MAX_CACHED_SECTIONS:
+            _section_cache.popitem(last=False)
+
+
+def _normalise_entry(raw) -> dict:
+    raw = raw if isinstance(raw, dict) else {}
+    try:
+        score = min(10.0, max(1.0, float(raw.get("score", 5))))
+    except (TypeError, ValueError):
+        score = 5.0
+    return {
+        "score": score,
+        "strengths": [str(item) for item in raw.get("strengths", [])][:2],
+        "improvements": [str(item) for item in raw.get("improvements", [])][:2],
+        "ats_friendly": bool(raw.get("ats_friendly", True)),
+    }
+
+
+def _section_budgets(sizes: List[int], budget: int) -> List[int]:
+    """Split `budget` tokens: small sections keep their size, large ones share the rest."""
+    budgets = [0] * len(sizes)
+    remaining = budget
+    order = sorted(range(len(sizes)), key=lambda index: sizes[index])
+    for position, index in enumerate(order):
+        budgets[index] = min(sizes[index], remaining // (len(sizes) - position))
+        remaining -= budgets[index]
+    return budgets
+
+
+def _canonical(name: str) -> str:
+    base, _, suffix = name.rpartition("_")
+    return base if base and suffix.isdigit() else name
+
+
+def _combine(sections: List[Tuple[str, str]], entries: Dict[str, dict]) -> dict:
+    total_weight = 0.0
+    weighted = 0.0
+    strengths: List[str] = []
+    improvements: List[str] = []
+    scores: Dict[str, List[float]] = {}
+    for name, _ in sections:
+        entry = entries[name]
+        canonical = _canonical(name)
+        weight = SECTION_WEIGHTS.get(canonical, DEFAULT_SECTION_WEIGHT)
+        total_weight += weight
+        weighted += entry["score"] * weight
+        scores.setdefault(canonical, []).append(entry["score"])
+        strengths.extend(entry["strengths"])
+        improvements.extend(entry["improvements"])
+
+    return {
+        "overall_score": round(weighted / total_weight * 10) if total_weight else 0,
+        # Repeated headings (experience, experience_2) are reported as one section.
+        "sections": {name: round(sum(values) / len(values)) for name, values in scores.items()},
+        "strengths": list(dict.fromkeys(strengths))[:6],
+        "improvements": list(dict.fromkeys(improvements))[:6],
+        "ats_friendly": all(entries[name]["ats_friendly"] for name, _ in sections),
+    }
+
+
+async def score_resume_sections(
+    resume_text: str,
+    *,
+    target_job: Optional[str] = None,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+) -> dict:
+    """Score a resume section by section, sending only sections not already cached.
+
+    Section results are cached by a hash of their content, the target job and the
+    provider/model, so an edit to one section costs one small model call. Unchanged
+    sections are passed to the model as a digest (first line, key terms, cached score), and
+    the header (name, contact details) as is, for context only; the header is never scored.
+    """
+    context = f"{target_job or ''}\n{provider or ''}\n{model or ''}"
+    with span("prompt"):
+        sections = split_sections(resume_text)
+        header = sections.pop(0)[1] if sections[0][0] == "header" else ""
+        entries: Dict[str, dict] = {}
+        changed: List[Tuple[str, str, str]] = []
+        for name, body in sections:
+            key = _section_key(name, body, context)
+            cached = _cache_get(key)
+            if cached is None:
+                changed.append((name, body, key))
+            else:
+                entries[name] = cached
+
+    if changed:
+        system = (
+            "You are an ATS (Applicant Tracking System) expert and hiring manager. "
+            "Score only the resume sections you are asked to score and return ONLY valid JSON: "
+            "{\"sections\": {\"<section name>\": {\"score\": 1-10, \"strengths\": [\"str1\"], "
+            "\"improvements\": [\"imp1\"], \"ats_friendly\": bool}}}"
+        )
+        unchanged_summary = "\n".join(
+            f"- {name} (already scored {round(entries[name]['score'])}/10): {section_digest(body)}"
+            for name, body in sections
+            if name in entries
+        )
+        # The route's input budget covers the header and the changed sections together, so
+        # sections are only compressed when they do not fit as they are.
+        budget = ROUTE_BUDGETS["resume/score"]
+        header = compress_text(header, int(budget * HEADER_BUDGET_SHARE)) if header else ""
+        budgets = _section_budgets(
+            [estimate_tokens(body) for _, body, _ in changed], budget - estimate_tokens(header)
+        )
+        changed_text = "\n\n".join(
+            f"### {name}\n{compress_text(body, section_budget, target_job or '')}"
+            for (name, body, _), section_budget in zip(changed, budgets)
+        )
+        user = (
+            f"Score these resume sections{f' for the role: {target_job}' if target_job else ''}.\n"
+            f"Use the section names exactly as given.\n\n{changed_text}"
+        )
+        if header:
+            user += f"\n\nResume header (context only, do not score):\n{header}"
+        if unchanged_summary:
+            user += f"\n\nOther sections of the same resume (context only, do not score):\n{unchanged_summary}"
+
+        result = await ask_ai(
+            system_prompt=system,
+            user_prompt=user,
+            provider=provider,
+            model=model,
+            json_mode=True,
+            max_tokens=150 + 120 * len(changed),
+            temperature=0.2,
+        )
+        with span("parse"):
+            scored = json.loads(result).get("sections", {})
+            if not isinstance(scored, dict):
+                raise AIServiceError("AI returned invalid section scores", status_code=500)
+            for name, _, key in changed:
+                entries[name] = _normalise_entry(scored.get(name))
+                if name in scored:
+                    _cache_put(key, entries[name])
+
+    combined = _combine(sections, entries)
+    combined["rescored_sections"] = [name for name, _, _ in changed]
+    return combined
@@ -0,0 +1,166 @@
+"""Semantic answer cache for free-text routes.
+
+Prompts are normalised, stripped of filler words ("how do I", "my", ...) and embedded
+locally as hashed character-trigram, word and word-bigram vectors, then compared against
+recent prompts of the same route with one matrix-vector product. A stored answer is reused
+when cosine similarity clears the route's threshold and the rest of the request (system
+prompt, history, provider, model, ...) is identical, as captured by a caller-supplied scope
+string. Numbers and capitalised names in the prompt are part of the scope too, so prompts
+that differ only in key facts (a date, a salary, a company) never share an answer.
+
+Only routes listed in AI_SEMANTIC_CACHE_ROUTES are cached. json_mode routes must not use
+this cache: their answers depend on the exact input. Generic passthrough routes such as
+`ai/generate` are off by default; templated prompts there are too alike to cache safely.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.text_vectors import char_ngrams, hashed_counts, normalise
+
+EMBEDDING_DIM = 512
+MAX_ENTRIES_PER_ROUTE = int(os.getenv("AI_SEMANTIC_CACHE_SIZE", "1000"))
+DEFAULT_ROUTES = "chat/message=0.9"
+SIMILARITY_BUCKETS = (0.9, 0.95, 0.99)
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_NUMBER_RE = re.compile(r"\d+(?:[.,:/-]\d+)*")
+# A capitalised word that does not start a sentence.
+_NAME_RE = re.compile(r"(?<![.!?\n]\s)(?<!^)\b[A-Z][\w'-]+")
+FILLER_WORDS = frozenset(
+    "a an the to of for in on is are was how do does did can could should would please tell "
+    "i me my mine we our you your what which".split()
+)
+
+
+def _parse_routes(raw: str) -> Dict[str, float]:
+    routes = {}
+    for item in raw.split(","):
+        name, _, threshold = item.strip().partition("=")
+        if name:
+            routes[name] = float(threshold) if threshold else 0.9
+    return routes
+
+
+def normalise_prompt(text: str) -> List[str]:
+    """Lowercased content words, without punctuation or filler words."""
+    words = _PUNCTUATION_RE.sub(" ", text.lower()).split()
+    return [word for word in words if word not in FILLER_WORDS]
+
+
+def embed(text: str) -> np.ndarray:
+    words = normalise_prompt(text)
+    bigrams = [f"{first} {second}" for first, second in zip(words, words[1:])]
+    features = char_ngrams(" ".join(words)) + words + bigrams
+    return normalise(hashed_counts(features, EMBEDDING_DIM))
+
+
+def key_facts(text: str) -> List[str]:
+    """Numbers and mid-sentence capitalised words, which must match exactly to reuse."""
+    stripped = text.strip()
+    return sorted(set(_NUMBER_RE.findall(stripped)) | set(_NAME_RE.findall(stripped)))
+
+
+def scope_key(*parts) -> int:
+    """64-bit digest of everything besides the prompt that the answer depends on."""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class _RouteCache:
+    def __init__(self, threshold: float, capacity: int) -> None:
+        self.threshold = threshold
+        self.vectors = np.zeros((capacity, EMBEDDING_DIM), dtype=np.float32)
+        self.scopes = np.zeros(capacity, dtype=np.uint64)
+        self.answers: List[Optional[str]] = [None] * capacity
+        self.last_used = np.full(capacity, -1, dtype=np.int64)
+        self.size = 0
+        self.lookups = 0
+        self.hits = 0
+        self.hit_similarity_total = 0.0
+        self.hit_similarity_buckets = [0] * (len(SIMILARITY_BUCKETS) + 1)
+
+    def stats(self) -> dict:
+        bounds = [self.threshold, *SIMILARITY_BUCKETS, 1.0]
+        return {
+            "threshold": self.threshold,
+            "entries": self.size,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "mean_hit_similarity": (
+                round(self.hit_similarity_total / self.hits, 4) if self.hits else None
+            ),
+            "hit_similarity_histogram": {
+                f"{low:.2f}-{high:.2f}": count
+                for low, high, count in zip(bounds, bounds[1:], self.hit_similarity_buckets)
+                if high > low
+            },
+        }
+
+
+class SemanticCache:
+    def __init__(self, routes: Dict[str, float], capacity: int = MAX_ENTRIES_PER_ROUTE) -> None:
+        self._lock = threading.Lock()
+        self._tick = 0
+        self._routes = {name: _RouteCache(threshold, capacity) for name, threshold in routes.items()}
+
+    def enabled(self, route: str) -> bool:
+        return route in self._routes
+
+    def lookup(self, route: str, prompt: str, scope: int) -> Optional[str]:
+        cache = self._routes.get(route)
+        if cache is None:
+            return None
+        query = embed(prompt)
+        scope = scope_key(scope, *key_facts(prompt))
+        with self._lock:
+            cache.lookups += 1
+            if not cache.size:
+                return None
+            scores = cache.vectors[: cache.size] @ query
+            scores[cache.scopes[: cache.size] != np.uint64(scope)] = -1.0
+            row = int(np.argmax(scores))
+            best = float(scores[row])
+            if best < cache.threshold:
+                return None
+
+            self._tick += 1
+            cache.last_used[row] = self._tick
+            cache.hits += 1
+            cache.hit_similarity_total += best
+            bucket = int(np.searchsorted(SIMILARITY_BUCKETS, best, side="right"))
+            cache.hit_similarity_buckets[bucket] += 1
+            return cache.answers[row]
+
+    def store(self, route: str, prompt: str, scope: int, answer: str) -> None:
+        cache = self._routes.get(route)
+        if cache is None:
+            return
+        vector = embed(prompt)
+        scope = scope_key(scope, *key_facts(prompt))
+        with self._lock:
+            if cache.size < len(cache.answers):
+                row = cache.size
+                cache.size += 1
+            else:
+                row = int(np.argmin(cache.last_used))
+            self._tick += 1
+            cache.vectors[row] = vector
+            cache.scopes[row] = scope
+            cache.answers[row] = answer
+            cache.last_used[row] = self._tick
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {route: cache.stats() for route, cache in self._routes.items()}
+
+
+semantic_cache = SemanticCache(
+    _parse_routes(os.getenv("AI_SEMANTIC_CACHE_ROUTES", DEFAULT_ROUTES))
+)
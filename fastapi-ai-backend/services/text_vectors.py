@@ -0,0 +1,47 @@
+import re
+import zlib
+from typing import Iterable, List
+
+import numpy as np
+
+DEFAULT_DIM = 1024
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our that the this to we "
+    "will with you your i me my".split()
+)
+
+
+def word_tokens(text: str) -> List[str]:
+    """Lowercased word unigrams and bigrams, without stopwords."""
+    words = [word for word in _WORD_RE.findall(text.lower()) if word not in STOPWORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def char_ngrams(text: str, n: int = 3) -> List[str]:
+    """Character n-grams of the whitespace-normalised, lowercased text, padded at word edges."""
+    padded = f" {' '.join(_WORD_RE.findall(text.lower()))} "
+    return [padded[index : index + n] for index in range(len(padded) - n + 1)]
+
+
+def hashed_counts(features: Iterable[str], dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Signed feature hashing into a float32 vector of log-scaled term counts.
+
+    crc32 is used instead of hash() so vectors are stable across processes and can be
+    persisted. The top bit of the hash picks the sign, which keeps collisions unbiased.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    hashes = np.fromiter(
+        (zlib.crc32(feature.encode()) for feature in features), dtype=np.uint32
+    )
+    if not len(hashes):
+        return vector
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, (hashes & 0x7FFFFFFF) % dim, signs)
+    return np.sign(vector) * np.log1p(np.abs(vector))
+
+
+def normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
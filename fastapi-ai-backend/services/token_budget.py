@@ -0,0 +1,210 @@
+"""Input token budgeting for large free-text fields.
+
+Token counts are estimated locally (no tokenizer download): words cost one token plus one per
+six characters beyond the first, and each punctuation mark costs one, which tracks
+cl100k-style tokenizers closely enough for budgeting. Oversized inputs are compressed in
+stages, stopping once they fit:
+
+1. collapse whitespace and drop boilerplate lines (EEO statements, a lone "apply now",
+   page footers)
+2. drop repeated prose lines
+3. keep the most relevant sentences (overlap with a query such as the target job, plus a
+   bonus for early sentences), in their original order; overlong sentences are cut into
+   pieces first, and if nothing fits the text is truncated at the budget
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+DEFAULT_CONTEXT_WINDOW = 16_000
+MIN_OUTPUT_TOKENS = 64
+SAFETY_MARGIN_TOKENS = 256
+DEDUP_MIN_WORDS = 6
+
+# Longest matching prefix wins.
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o": 128_000,
+    "gpt-4.1": 1_000_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-4": 8_192,
+    "gpt-3.5-turbo": 16_385,
+    "o1": 128_000,
+    "o3": 200_000,
+    "claude-3": 200_000,
+    "claude-sonnet": 200_000,
+    "claude-opus": 200_000,
+    "claude-haiku": 200_000,
+}
+
+DEFAULT_ROUTE_BUDGETS = {
+    "resume/score": 3000,
+    "resume/profile-insights": 3000,
+    "jobpost/improve": 3000,
+    "jobpost/extract-skills": 2500,
+    "ai/generate": 6000,
+    "admin-ai/insights": 6000,
+}
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]*\s*")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Matched at the start of whitespace-collapsed lines: EEO statements are recognised by how
+# they open, footer and UI fragments only when they are the whole line, so content that
+# merely mentions cookies or a privacy policy is kept.
+_BOILERPLATE_RE = re.compile(
+    r"(?:[\w&.,' -]{0,80} (?:is|are) (?:an? |proud to be an? ))?"
+    r"equal (?:employment )?opportunity employer"
+    r"|all qualified applicants will receive"
+    r"|reasonable accommodations? (?:is|are) available"
+    r"|(?:apply now|click here(?: to apply)?|share this job|privacy policy|cookie policy"
+    r"|(?:accept|manage) (?:all )?cookies|references available upon request"
+    r"|(?:(?:©|\(c\)|copyright)[^\n]{0,60}?)?all rights reserved"
+    r"|page \d+ of \d+)[\s.!:|>-]*$",
+    re.IGNORECASE,
+)
+
+
+def _parse_budgets(raw: str) -> Dict[str, int]:
+    budgets = dict(DEFAULT_ROUTE_BUDGETS)
+    for item in raw.split(","):
+        name, _, value = item.strip().partition("=")
+        if name and value:
+            budgets[name] = int(value)
+    return budgets
+
+
+ROUTE_BUDGETS = _parse_budgets(os.getenv("AI_INPUT_TOKEN_BUDGETS", ""))
+
+
+def estimate_tokens(text: str) -> int:
+    return sum(1 + (len(token) - 1) // 6 for token in _TOKEN_RE.findall(text))
+
+
+def context_window(model: str) -> int:
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if model.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+def fit_max_tokens(model: str, prompt_tokens: int, requested: int) -> int:
+    """Cap the output budget at what is left of the model's window after the prompt."""
+    available = context_window(model) - prompt_tokens - SAFETY_MARGIN_TOKENS
+    return max(MIN_OUTPUT_TOKENS, min(requested, available))
+
+
+def _strip_boilerplate_and_duplicates(text: str) -> str:
+    seen = set()
+    lines: List[str] = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if not line:
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if _BOILERPLATE_RE.match(line):
+            continue
+        # Only prose lines are de-duplicated; short repeated lines (list items, closing
+        # brackets of structured text) carry meaning where they are.
+        if len(line.split()) >= DEDUP_MIN_WORDS:
+            key = line.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _token_split(text: str, limit: int) -> List[str]:
+    """Cut `text` into consecutive pieces of at most `limit` estimated tokens."""
+    pieces = []
+    start = 0
+    used = 0
+    for match in _TOKEN_RE.finditer(text):
+        cost = 1 + (len(match.group(0)) - 1) // 6
+        if used and used + cost > limit:
+            pieces.append(text[start : match.start()])
+            start = match.start()
+            used = 0
+        used += cost
+    pieces.append(text[start:])
+    return pieces
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """The leading `budget` tokens of `text`."""
+    head = _token_split(text, budget)[0]
+    if estimate_tokens(head) > budget:
+        # A single "word" longer than the budget, e.g. a pasted blob without spaces.
+        head = head[: budget * 6]
+    return head.strip()
+
+
+def _select_sentences(text: str, budget: int, query: str) -> str:
+    # Sentences longer than a fraction of the budget (long pastes without punctuation or
+    # line breaks) are cut into pieces so they can still be selected.
+    piece_limit = max(32, budget // 8)
+    sentences = [
+        piece
+        for match in _SENTENCE_RE.finditer(text)
+        if match.group(0).strip()
+        for piece in _token_split(match.group(0), piece_limit)
+        if piece.strip()
+    ]
+    query_words = set(_WORD_RE.findall(query.lower()))
+    scored = []
+    for position, sentence in enumerate(sentences):
+        words = _WORD_RE.findall(sentence.lower())
+        overlap = len(query_words.intersection(words)) / (len(query_words) or 1)
+        density = len(set(words)) / (len(words) or 1)
+        position_bonus = 1.0 / (1 + position / 5)
+        scored.append((2 * overlap + density + position_bonus, position, sentence))
+
+    selected = []
+    used = 0
+    for _, position, sentence in sorted(scored, key=lambda item: item[0], reverse=True):
+        cost = estimate_tokens(sentence)
+        if used + cost > budget:
+            continue
+        selected.append((position, sentence))
+        used += cost
+    return "".join(sentence for _, sentence in sorted(selected)).strip()
+
+
+def compress_text(text: str, budget: int, query: str = "") -> str:
+    """Shrink `text` to about `budget` tokens, removing the least useful content first."""
+    if estimate_tokens(text) <= budget:
+        return text
+    text = _strip_boilerplate_and_duplicates(text)
+    if estimate_tokens(text) <= budget:
+        return text
+    return _select_sentences(text, budget, query) or truncate_tokens(text, budget)
+
+
+def budget_field(route: str, text: Optional[str], query: str = "", share: float = 1.0) -> Optional[str]:
+    """Compress a request field to `share` of the route's input budget."""
+    if not text or route not in ROUTE_BUDGETS:
+        return text
+    return compress_text(text, int(ROUTE_BUDGETS[route] * share), query)
+
+
+def fit_json_collections(data: dict, budget: int) -> dict:
+    """Halve the longest list or dict values of `data` until its JSON fits `budget` tokens."""
+    data = dict(data)
+    while estimate_tokens(json.dumps(data)) > budget:
+        sizes = [
+            (len(value), key) for key, value in data.items() if isinstance(value, (list, dict))
+        ]
+        if not sizes:
+            break
+        size, key = max(sizes)
+        if size <= 1:
+            break
+        value = data[key]
+        if isinstance(value, dict):
+            data[key] = dict(list(value.items())[: size // 2])
+        else:
+            data[key] = value[: size // 2]
+    return data
@@ -0,0 +1,162 @@
+import contextvars
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+
+DEBUG_HEADER = b"x-ai-debug"
+PROFILE_INTERVAL_SECONDS = 0.001
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar(
+    "ai_trace", default=None
+)
+_NULL_SPAN = nullcontext()
+
+
+class Trace:
+    __slots__ = ("started_at", "spans")
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.spans: dict[str, float] = {}
+
+    def add(self, name: str, duration_ms: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + duration_ms
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={duration:.2f}" for name, duration in self.spans.items())
+
+
+class _Span:
+    __slots__ = ("trace", "name", "started_at")
+
+    def __init__(self, trace: Trace, name: str) -> None:
+        self.trace = trace
+        self.name = name
+        self.started_at = 0.0
+
+    def __enter__(self) -> None:
+        self.started_at = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.trace.add(self.name, (time.perf_counter() - self.started_at) * 1000)
+
+
+def span(name: str):
+    """Time a block as a named phase of the current request, if it is traced."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name)
+
+
+def mark(name: str) -> None:
+    """Record the time elapsed since the request started as a phase.
+
+    Called at the top of a handler to capture body parsing and pydantic validation,
+    which FastAPI runs before the handler body.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, (time.perf_counter() - trace.started_at) * 1000)
+
+
+class SamplingProfiler:
+    """Samples the stack of one thread and aggregates it as collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL_SECONDS) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ai-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def dump_collapsed(self) -> str:
+        """Write samples in collapsed-stack format (loadable by speedscope) and return the path."""
+        directory = os.getenv("AI_PROFILE_DIR") or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="ai-profile-", suffix=".collapsed", dir=directory)
+        with os.fdopen(fd, "w") as handle:
+            for stack, count in self.samples.most_common():
+                handle.write(f"{stack} {count}\n")
+        return path
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value
+    return None
+
+
+class TracingMiddleware:
+    """Adds a Server-Timing header with per-phase spans to traced requests.
+
+    Tracing is on for every request when AI_TRACING_ENABLED=true, and for a single request
+    when it carries an X-AI-Debug header equal to AI_DEBUG_SECRET. Debug requests are also
+    sampled by a profiler and the dump path is returned in an X-AI-Profile header.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.enabled = os.getenv("AI_TRACING_ENABLED") == "true"
+        secret = os.getenv("AI_DEBUG_SECRET")
+        self.debug_secret = secret.encode() if secret else None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        debug = self.debug_secret is not None and _header(scope, DEBUG_HEADER) == self.debug_secret
+        if not (self.enabled or debug):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        token = _current_trace.set(trace)
+        profiler = SamplingProfiler(threading.get_ident()) if debug else None
+        if profiler:
+            profiler.start()
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                trace.add("total", (time.perf_counter() - trace.started_at) * 1000)
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", trace.server_timing())
+                if profiler:
+                    profiler.stop()
+                    headers.append("X-AI-Profile", os.path.basename(profiler.dump_collapsed()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if profiler:
+                profiler.stop()
+            _current_trace.reset(token)
@@ -0,0 +1,70 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from pydantic import BaseModel
+
+MAX_ENTRIES = int(os.getenv("AI_VARIANT_CACHE_SIZE", "512"))
+TTL_SECONDS = float(os.getenv("AI_VARIANT_CACHE_TTL_SECONDS", "1800"))
+BATCH_SIZE = int(os.getenv("AI_VARIANT_BATCH_SIZE", "3"))
+
+_lock = threading.Lock()
+_leftovers: "OrderedDict[str, tuple[float, list[str]]]" = OrderedDict()
+
+
+def cache_key(route: str, req: BaseModel) -> str:
+    """Key a request by route and every field except the number of variants asked for."""
+    payload = req.model_dump_json(exclude={"variants"})
+    return hashlib.sha256(f"{route}\n{payload}".encode()).hexdigest()
+
+
+def take(key: str, count: int) -> list[str]:
+    """Pop up to `count` unserved variants for `key`, oldest first."""
+    with _lock:
+        entry = _leftovers.get(key)
+        if entry is None:
+            return []
+        stored_at, variants = entry
+        if time.monotonic() - stored_at > TTL_SECONDS:
+            del _leftovers[key]
+            return []
+        taken, remaining = variants[:count], variants[count:]
+        if remaining:
+            _leftovers[key] = (stored_at, remaining)
+            _leftovers.move_to_end(key)
+        else:
+            del _leftovers[key]
+        return taken
+
+
+def put(key: str, variants: list[str]) -> None:
+    """Store variants that were generated but not served, for later regenerate requests."""
+    if not variants:
+        return
+    with _lock:
+        existing = _leftovers.pop(key, None)
+        previous = existing[1] if existing else []
+        _leftovers[key] = (time.monotonic(), [*previous, *variants])
+        while len(_leftovers) > MAX_ENTRIES:
+            _leftovers.popitem(last=False)
+
+
+async def serve(
+    key: str, count: int, generate: Callable[[int], Awaitable[list[str]]]
+) -> list[str]:
+    """`count` variants that were never returned before: leftovers first, then new ones.
+
+    When more than one variant is asked for, new ones are generated at least BATCH_SIZE at a
+    time and the ones not returned now are kept for the next regenerate press; a single
+    variant is generated alone.
+    """
+    served = take(key, count)
+    missing = count - len(served)
+    if missing > 0:
+        generated = await generate(max(missing, BATCH_SIZE) if count > 1 else missing)
+        served.extend(generated[:missing])
+        put(key, generated[missing:])
+    return served
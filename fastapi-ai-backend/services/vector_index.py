@@ -0,0 +1,222 @@
+import json
+import math
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, use a single worker
+    fcntl = None
+
+import numpy as np
+
+from services.text_vectors import DEFAULT_DIM
+
+MIN_CAPACITY = 64
+
+
+class VectorIndex:
+    """Incrementally updatable, memory-mapped store of hashed term-count vectors.
+
+    Rows live in a float32 memmap (`vectors.f32`) that doubles in size when full; ids and
+    short labels live in `meta.json`. Document frequencies are kept per dimension so
+    queries are TF-IDF weighted at search time and stay correct as documents are added,
+    replaced or removed. Searches score every row with one matrix product.
+
+    Several worker processes can share a directory: every operation holds an flock on
+    `index.lock` (shared for reads, exclusive for writes) and reloads the metadata first if
+    another process has replaced `meta.json` since it was last read.
+    """
+
+    def __init__(self, directory: str, dim: int = DEFAULT_DIM) -> None:
+        self.directory = directory
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._meta_path = os.path.join(directory, "meta.json")
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, "index.lock"), "a+")
+        self._meta_stamp: Optional[Tuple[int, int]] = None
+
+        with self._lock, self._file_lock(exclusive=True):
+            if not self._load():
+                self.ids: List[Optional[str]] = []
+                self.labels: Dict[str, str] = {}
+                self.vectors = np.memmap(
+                    self._vectors_path, dtype=np.float32, mode="w+", shape=(MIN_CAPACITY, dim)
+                )
+                self._index_rows()
+                self._save()
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _locked(self, exclusive: bool = False) -> Iterator[None]:
+        with self._lock, self._file_lock(exclusive):
+            self._refresh()
+            yield
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._meta_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _load(self) -> bool:
+        """Read meta.json and map the vectors; False if there is no usable index on disk."""
+        stamp = self._stamp()
+        if stamp is None or not os.path.exists(self._vectors_path):
+            return False
+        with open(self._meta_path) as handle:
+            meta = json.load(handle)
+        if meta.get("dim") != self.dim:
+            return False
+        self.ids = meta["ids"]
+        self.labels = meta["labels"]
+        self.vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(meta["capacity"], self.dim)
+        )
+        self._meta_stamp = stamp
+        self._index_rows()
+        return True
+
+    def _index_rows(self) -> None:
+        self.rows = {item_id: row for row, item_id in enumerate(self.ids) if item_id is not None}
+        self._free = [row for row, item_id in enumerate(self.ids) if item_id is None]
+        self.df = (self.vectors[: len(self.ids)] != 0).sum(axis=0).astype(np.int64)
+        self._doc_norms: Optional[np.ndarray] = None
+
+    def _refresh(self) -> None:
+        if self._stamp() != self._meta_stamp:
+            self._load()
+
+    def __len__(self) -> int:
+        with self._locked():
+            return len(self.rows)
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        tmp_path = f"{self._vectors_path}.tmp"
+        grown = np.memmap(tmp_path, dtype=np.float32, mode="w+", shape=(new_capacity, self.dim))
+        grown[:capacity] = self.vectors
+        grown.flush()
+        del grown
+        self.vectors.flush()
+        del self.vectors
+        os.replace(tmp_path, self._vectors_path)
+        self.vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(new_capacity, self.dim)
+        )
+
+    def _save(self) -> None:
+        self.vectors.flush()
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w") as handle:
+            json.dump(
+                {
+                    "dim": self.dim,
+                    "capacity": self.vectors.shape[0],
+                    "ids": self.ids,
+                    "labels": self.labels,
+                },
+                handle,
+            )
+        os.replace(tmp_path, self._meta_path)
+        self._meta_stamp = self._stamp()
+
+    def upsert(self, items: Sequence[Tuple[str, np.ndarray, str]]) -> None:
+        """Insert or replace (id, vector, label) items and persist the index."""
+        with self._locked(exclusive=True):
+            new_rows = sum(1 for item_id, _, _ in items if item_id not in self.rows)
+            self._grow(len(self.ids) + max(0, new_rows - len(self._free)))
+            for item_id, vector, label in items:
+                row = self.rows.get(item_id)
+                if row is None:
+                    row = self._free.pop() if self._free else len(self.ids)
+                    if row == len(self.ids):
+                        self.ids.append(item_id)
+                    else:
+                        self.ids[row] = item_id
+                    self.rows[item_id] = row
+                else:
+                    self.df -= self.vectors[row] != 0
+                self.vectors[row] = vector
+                self.df += vector != 0
+                self.labels[item_id] = label
+            self._doc_norms = None
+            self._save()
+
+    def remove(self, item_id: str) -> bool:
+        with self._locked(exclusive=True):
+            row = self.rows.pop(item_id, None)
+            if row is None:
+                return False
+            self.df -= self.vectors[row] != 0
+            self.vectors[row] = 0
+            self.ids[row] = None
+            self.labels.pop(item_id, None)
+            self._free.append(row)
+            self._doc_norms = None
+            self._save()
+            return True
+
+    def vector(self, item_id: str) -> Optional[np.ndarray]:
+        with self._locked():
+            row = self.rows.get(item_id)
+            return None if row is None else np.array(self.vectors[row])
+
+    def label(self, item_id: str) -> str:
+        with self._locked():
+            return self.labels.get(item_id, "")
+
+    def _idf_weights(self) -> np.ndarray:
+        count = len(self.rows)
+        idf = np.log((1 + count) / (1 + self.df)) + 1
+        return (idf * idf).astype(np.float32)
+
+    def search(
+        self, queries: np.ndarray, k: int = 10
+    ) -> List[List[Tuple[str, float]]]:
+        """Top-k (id, cosine similarity) per query row, with TF-IDF weighting."""
+        queries = np.atleast_2d(queries).astype(np.float32)
+        with self._locked():
+            size = len(self.ids)
+            if not self.rows:
+                return [[] for _ in range(len(queries))]
+            weights = self._idf_weights()
+            matrix = self.vectors[:size]
+            if self._doc_norms is None:
+                self._doc_norms = np.sqrt((matrix * matrix) @ weights)
+            doc_norms = self._doc_norms
+            query_norms = np.sqrt((queries * queries) @ weights)
+            scores = (queries * weights) @ matrix.T
+            ids = list(self.ids)
+
+        denominator = query_norms[:, None] * doc_norms[None, :]
+        scores = np.divide(scores, denominator, out=np.zeros_like(scores), where=denominator > 0)
+        scores[:, [row for row, item_id in enumerate(ids) if item_id is None]] = -math.inf
+
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for query_scores, rows in zip(scores, top):
+            rows = rows[np.argsort(-query_scores[rows], kind="stable")]
+            results.append(
+                [(ids[row], float(query_scores[row])) for row in rows.tolist() if ids[row] is not None]
+            )
+        return results